@@ -0,0 +1,136 @@
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Optional
+from app.core.metrics import ADMISSION_IN_FLIGHT, ADMISSION_QUEUE_DEPTH, ADMISSION_REJECTIONS, ADMISSION_WAIT
+
+
+class AdmissionRejected(Exception):
+    """
+    The limiter is saturated; the caller should retry after `retry_after` seconds.
+    """
+
+    def __init__(self, limiter: str, reason: str, retry_after: int):
+        super().__init__(f"{limiter} is overloaded ({reason}); retry after {retry_after}s")
+        self.limiter = limiter
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    Concurrency limiter with a bounded FIFO wait queue. At most max_concurrent
+    callers hold a slot; up to max_queue more wait (for at most max_wait
+    seconds). Anyone beyond that is rejected immediately, so a spike turns
+    into fast 429s instead of a pile-up of slow upstream calls.
+    Event-loop only; not thread-safe.
+    """
+
+    def __init__(self, name: str, max_concurrent: int, max_queue: int, max_wait: float):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.in_flight = 0
+        self._waiters: "deque[asyncio.Future]" = deque()
+        # Moving average of how long a slot is held, for Retry-After
+        self._hold_seconds: Optional[float] = None
+        self.admitted = 0
+        self.rejected = 0
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    def retry_after(self) -> int:
+        hold = self._hold_seconds or 1.0
+        # Time for the queue ahead (plus this caller) to drain through the slots
+        estimate = hold * (self.queue_depth + 1) / max(self.max_concurrent, 1)
+        return min(max(1, math.ceil(estimate)), 60)
+
+    def _reject(self, reason: str):
+        self.rejected += 1
+        ADMISSION_REJECTIONS.inc(limiter=self.name, reason=reason)
+        raise AdmissionRejected(self.name, reason, self.retry_after())
+
+    def _update_gauges(self):
+        ADMISSION_IN_FLIGHT.set(self.in_flight, limiter=self.name)
+        ADMISSION_QUEUE_DEPTH.set(self.queue_depth, limiter=self.name)
+
+    async def acquire(self, max_wait: Optional[float] = None):
+        """
+        Takes a slot, queueing for at most max_wait seconds (never longer
+        than the limiter's own max_wait).
+        """
+        wait = self.max_wait if max_wait is None else min(self.max_wait, max_wait)
+        if self.in_flight < self.max_concurrent and not self._waiters:
+            self.in_flight += 1
+            self.admitted += 1
+            ADMISSION_WAIT.observe(0.0, limiter=self.name)
+            self._update_gauges()
+            return
+
+        if self.queue_depth >= self.max_queue:
+            self._reject("queue_full")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._update_gauges()
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout=wait)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as we gave up: give it back
+                self.release()
+            else:
+                waiter.cancel()
+                self._waiters.remove(waiter)
+            self._update_gauges()
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            # "deadline" when the caller's shorter max_wait (its remaining
+            # time) ran out rather than the limiter's own
+            self._reject("deadline" if wait < self.max_wait else "timeout")
+
+        # release() handed its slot to us; in_flight already counts it
+        self.admitted += 1
+        ADMISSION_WAIT.observe(time.perf_counter() - start, limiter=self.name)
+        self._update_gauges()
+
+    def release(self):
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                self._update_gauges()
+                return
+        self.in_flight -= 1
+        self._update_gauges()
+
+    @asynccontextmanager
+    async def slot(self, max_wait: Optional[float] = None):
+        await self.acquire(max_wait)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            held = time.perf_counter() - start
+            self._hold_seconds = held if self._hold_seconds is None else 0.8 * self._hold_seconds + 0.2 * held
+            self.release()
+
+    def snapshot(self) -> dict:
+        return {
+            "limiter": self.name,
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "max_wait_seconds": self.max_wait,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "avg_hold_seconds": round(self._hold_seconds, 3) if self._hold_seconds is not None else None,
+            "retry_after_seconds": self.retry_after(),
+        }
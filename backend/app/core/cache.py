@@ -0,0 +1,105 @@
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """
+    Small in-process LRU cache with per-entry expiry.
+    Not thread-safe; meant to be used from the event loop only.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return default
+
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0 or self.maxsize <= 0:
+            return
+
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def purge(self, predicate: Callable[[Hashable, Any], bool]) -> int:
+        """
+        Removes every entry for which predicate(key, value) is true.
+        """
+        doomed = [key for key, (_, value) in self._data.items() if predicate(key, value)]
+        for key in doomed:
+            del self._data[key]
+        return len(doomed)
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SizedLRUCache:
+    """
+    LRU cache of byte payloads bounded by total size rather than entry count.
+    Entries never expire; use it for values that never change once stored.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self._data: "OrderedDict[Hashable, Tuple[bytes, Any]]" = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None) -> Optional[Tuple[bytes, Any]]:
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+        self._data.move_to_end(key)
+        return entry
+
+    def set(self, key: Hashable, payload: bytes, meta: Any = None):
+        """
+        Stores payload (plus small metadata such as its ETag), evicting the
+        least recently used entries until the total fits in max_bytes.
+        """
+        size = len(payload)
+        if size > self.max_bytes:
+            return
+        self.pop(key)
+        self._data[key] = (payload, meta)
+        self.current_bytes += size
+        while self.current_bytes > self.max_bytes:
+            _, (evicted, _) = self._data.popitem(last=False)
+            self.current_bytes -= len(evicted)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.pop(key, None)
+        if entry is None:
+            return default
+        self.current_bytes -= len(entry[0])
+        return entry
+
+    def clear(self):
+        self._data.clear()
+        self.current_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -0,0 +1,149 @@
+import zlib
+from typing import List, Optional
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+# Content types worth compressing. Event streams are left alone so each event
+# reaches the client as soon as it is sent; PDFs and archives are already
+# compressed.
+COMPRESSIBLE_TYPES = (
+    "text/html", "text/plain", "text/csv", "text/css",
+    "application/json", "application/x-ndjson", "application/javascript", "application/xml",
+)
+
+
+def _supported_encodings() -> List[str]:
+    return ["br", "gzip"] if brotli is not None else ["gzip"]
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Picks the best supported encoding from an Accept-Encoding header,
+    honouring q-values; brotli wins ties.
+    """
+    supported = _supported_encodings()
+    weights = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name == "*":
+            for encoding in supported:
+                weights.setdefault(encoding, quality)
+        elif name in supported:
+            weights[name] = quality
+
+    candidates = [e for e in supported if weights.get(e, 0) > 0]
+    if not candidates:
+        return None
+    return max(candidates, key=lambda e: (weights[e], -supported.index(e)))
+
+
+class _Compressor:
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=brotli_quality)
+        else:
+            self._gzip = zlib.compressobj(gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        # Flushed per chunk so streamed responses stay incremental
+        if self.encoding == "br":
+            return self._brotli.process(data) + self._brotli.flush()
+        return self._gzip.compress(data) + self._gzip.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._brotli.finish()
+        return self._gzip.flush(zlib.Z_FINISH)
+
+
+class CompressionMiddleware:
+    """
+    Compresses responses with brotli or gzip, as negotiated via Accept-Encoding.
+    Small bodies, non-text types, event streams and responses that already
+    carry a Content-Encoding are passed through untouched.
+    """
+
+    def __init__(self, app, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        compressor: Optional[_Compressor] = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, compressor, passthrough
+            if message["type"] == "http.response.start":
+                start_message = message
+                headers = Headers(raw=message["headers"])
+                content_type = headers.get("content-type", "").split(";")[0].strip().lower()
+                passthrough = "content-encoding" in headers or content_type not in COMPRESSIBLE_TYPES
+                if passthrough:
+                    await send(message)
+                return
+
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if compressor is None:
+                if not more_body and len(body) < self.minimum_size:
+                    # Whole body is small; not worth the CPU
+                    passthrough = True
+                    await send(start_message)
+                    await send(message)
+                    return
+
+                compressor = _Compressor(encoding, self.gzip_level, self.brotli_quality)
+                headers = MutableHeaders(raw=start_message["headers"])
+                headers["Content-Encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                # The encoded body differs byte-for-byte from the identity one
+                etag = headers.get("etag")
+                if etag and not etag.startswith("W/"):
+                    headers["ETag"] = f"W/{etag}"
+                if more_body:
+                    del headers["Content-Length"]
+                    await send(start_message)
+                else:
+                    compressed = compressor.compress(body) + compressor.finish()
+                    headers["Content-Length"] = str(len(compressed))
+                    await send(start_message)
+                    await send({"type": "http.response.body", "body": compressed})
+                    return
+
+            data = compressor.compress(body)
+            if not more_body:
+                data += compressor.finish()
+            if data or not more_body:
+                await send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
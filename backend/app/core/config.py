@@ -1,24 +1,99 @@
-from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import List, Union
+import json
+from pydantic_settings import BaseSettings, NoDecode, SettingsConfigDict
+from typing import Annotated, Dict, List, Union
 from pydantic import field_validator
 
 class Settings(BaseSettings):
     PROJECT_NAME: str = "Snuggly Jackrabbit Buzz"
     MONGODB_URL: str
     DATABASE_NAME: str = "snuggly_jackrabbit_buzz"
-    ALLOWED_ORIGINS: List[str] = ["http://localhost:5173", "http://localhost:5137", "https://snuggly-jackrabbit-buzz-frontend.onrender.com"]
+    # Connection pool and timeouts (0 leaves the driver default / no limit)
+    MONGODB_MAX_POOL_SIZE: int = 100
+    MONGODB_MIN_POOL_SIZE: int = 0
+    MONGODB_MAX_IDLE_TIME_MS: int = 300000
+    MONGODB_CONNECT_TIMEOUT_MS: int = 10000
+    MONGODB_SERVER_SELECTION_TIMEOUT_MS: int = 10000
+    MONGODB_SOCKET_TIMEOUT_MS: int = 0
+    MONGODB_WAIT_QUEUE_TIMEOUT_MS: int = 0
+    # Wire compression in preference order; zstd needs `zstandard`, snappy `python-snappy`
+    MONGODB_COMPRESSORS: Annotated[List[str], NoDecode] = ["zstd", "snappy", "zlib"]
+    MONGODB_ZLIB_COMPRESSION_LEVEL: int = 6
+    MONGODB_READ_PREFERENCE: str = "primary"
+    # Admin-only reads (listing, export, dashboard) can be served by secondaries
+    MONGODB_ADMIN_READ_PREFERENCE: str = "secondaryPreferred"
+    MONGODB_ADMIN_MAX_STALENESS_SECONDS: int = 0
+    # Multi-document writes (POST /diagnostics, job-mode POST /responses) run
+    # in a transaction; needs a replica set or sharded cluster (Atlas is one),
+    # not a standalone mongod
+    MONGODB_USE_TRANSACTIONS: bool = False
+    ALLOWED_ORIGINS: Annotated[List[str], NoDecode] = ["http://localhost:5173", "http://localhost:5137", "https://snuggly-jackrabbit-buzz-frontend.onrender.com"]
 
-    @field_validator("ALLOWED_ORIGINS", mode="before")
+    @field_validator("ALLOWED_ORIGINS", "MONGODB_COMPRESSORS", "LLM_PROVIDERS", "OPENROUTER_MODELS", "GEMINI_MODELS", mode="before")
     @classmethod
-    def parse_allowed_origins(cls, v: Union[str, List[str]]) -> List[str]:
-        if isinstance(v, str) and not v.startswith("["):
-            return [i.strip() for i in v.split(",")]
+    def parse_list(cls, v: Union[str, List[str]]) -> List[str]:
+        # Env values arrive as raw strings (NoDecode): a JSON array or a comma-separated list
+        if isinstance(v, str):
+            if v.strip().startswith("["):
+                return json.loads(v)
+            return [i.strip() for i in v.split(",") if i.strip()]
         return v
 
     SECRET_KEY: str
     GEMINI_API_KEY: str
     OPENROUTER_API_KEY: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+
+    # LLM providers, tried in LLM_PROVIDERS order (each over its models in order).
+    # Base URLs can point at local OpenAI-compatible stubs.
+    LLM_PROVIDERS: Annotated[List[str], NoDecode] = ["openrouter", "gemini"]
+    OPENROUTER_BASE_URL: str = "https://openrouter.ai/api/v1"
+    OPENROUTER_MODELS: Annotated[List[str], NoDecode] = ["tngtech/deepseek-r1t2-chimera:free"]
+    GEMINI_BASE_URL: str = "https://generativelanguage.googleapis.com/v1beta/openai/"
+    GEMINI_MODELS: Annotated[List[str], NoDecode] = ["gemini-2.0-flash"]
+    # Send the analysis JSON schema as response_format (structured output)
+    OPENROUTER_STRUCTURED_OUTPUT: bool = True
+    GEMINI_STRUCTURED_OUTPUT: bool = True
+    LLM_REQUEST_TIMEOUT_SECONDS: float = 60.0
+    # Hedge after the provider's p95 latency (clamped), or the default
+    # until LLM_HEDGE_MIN_SAMPLES latencies have been seen
+    LLM_HEDGE_ENABLED: bool = True
+    LLM_HEDGE_DEFAULT_SECONDS: float = 10.0
+    LLM_HEDGE_MIN_SECONDS: float = 2.0
+    LLM_HEDGE_MAX_SECONDS: float = 30.0
+    LLM_HEDGE_MIN_SAMPLES: int = 20
+    # Providers below this recent success rate are tried last
+    LLM_MIN_SUCCESS_RATE: float = 0.5
+    LLM_BREAKER_FAILURE_THRESHOLD: int = 5
+    LLM_BREAKER_RESET_SECONDS: float = 30.0
+    # Admission control for analysis requests that reach the LLM: at most
+    # LLM_MAX_CONCURRENCY run at once, LLM_MAX_QUEUE more wait up to
+    # LLM_QUEUE_TIMEOUT_SECONDS, and the rest get a 429 with Retry-After
+    LLM_MAX_CONCURRENCY: int = 8
+    LLM_MAX_QUEUE: int = 32
+    LLM_QUEUE_TIMEOUT_SECONDS: float = 15.0
+
+    # Every request gets a deadline that bounds its MongoDB and LLM calls; an
+    # analysis that runs out of time falls back to the canned one. The budget
+    # is REQUEST_DEADLINE_SECONDS, or REQUEST_DEADLINE_ROUTES[longest path
+    # prefix] (0 = no deadline), or the client's X-Request-Timeout header
+    # (seconds, capped at REQUEST_DEADLINE_MAX_SECONDS).
+    REQUEST_DEADLINE_SECONDS: float = 30.0
+    REQUEST_DEADLINE_MAX_SECONDS: float = 120.0
+    REQUEST_DEADLINE_ROUTES: Dict[str, float] = {
+        "/responses": 75.0, "/diagnostics": 75.0, "/admin/export": 0, "/admin/live": 0, "/leads/bulk": 0,
+    }
+    # Kept back from the LLM's share so the fallback can still be stored in time
+    LLM_DEADLINE_RESERVE_SECONDS: float = 2.0
+
+    # Argon2 cost parameters; raising them rehashes passwords on next login
+    ARGON2_TIME_COST: int = 3
+    ARGON2_MEMORY_COST: int = 65536
+    ARGON2_PARALLELISM: int = 4
+    PASSWORD_HASH_WORKERS: int = 2
+
+    # Verified admin tokens are cached for at most this long (and never past exp)
+    ADMIN_CACHE_TTL_SECONDS: int = 60
+    ADMIN_CACHE_MAX_ENTRIES: int = 1024
     
     # Email settings
     MAIL_USERNAME: str
@@ -31,6 +106,95 @@ class Settings(BaseSettings):
     # Resend setting
     RESEND_API_KEY: str
     RESEND_FROM_EMAIL: str
+    # Point at a local stand-in (e.g. loadtest/stubs.py) for load tests
+    RESEND_API_URL: str = "https://api.resend.com"
+    EMAIL_SEND_TIMEOUT_SECONDS: float = 15.0
+
+    # Email outbox; EMAIL_TRANSPORT is "resend" or "fake" (logs instead of sending)
+    EMAIL_TRANSPORT: str = "resend"
+    EMAIL_SEND_CONCURRENCY: int = 4
+    EMAIL_BATCH_SIZE: int = 10
+    EMAIL_MAX_ATTEMPTS: int = 5
+    EMAIL_RETRY_BASE_SECONDS: int = 30
+    EMAIL_RETRY_MAX_SECONDS: int = 3600
+    EMAIL_LEASE_SECONDS: int = 120
+    EMAIL_POLL_SECONDS: float = 10.0
+    EMAIL_SENT_RETENTION_SECONDS: int = 7 * 24 * 3600
+
+    # Rendered report PDFs, one file per result
+    REPORT_CACHE_DIR: str = "report_cache"
+
+    # Analysis settings
+    # "sync" generates the analysis inside POST /responses, "job" stores the
+    # response as pending and hands it to the background workers.
+    ANALYSIS_MODE: str = "sync"
+    ANALYSIS_WORKERS: int = 4
+    ANALYSIS_JOB_MAX_ATTEMPTS: int = 3
+    ANALYSIS_JOB_LEASE_SECONDS: int = 300
+    ANALYSIS_JOB_POLL_SECONDS: float = 5.0
+    # Pending responses older than the grace period with no job (the
+    # submission died between its two writes) are requeued on this schedule
+    ANALYSIS_ORPHAN_SWEEP_SECONDS: float = 300.0
+    ANALYSIS_ORPHAN_GRACE_SECONDS: float = 60.0
+
+    # Prompt template (see prompt_engine.TEMPLATES). Cached analyses are
+    # keyed by it, so switching versions never reuses another prompt's output.
+    ANALYSIS_PROMPT_VERSION: str = "v2"
+    # Longer free-text answers are clipped in the prompt
+    ANALYSIS_MAX_ANSWER_CHARS: int = 1000
+    ANALYSIS_CACHE_ENABLED: bool = True
+    ANALYSIS_CACHE_MAX_ENTRIES: int = 1024
+    ANALYSIS_CACHE_TTL_SECONDS: int = 3600
+    ANALYSIS_CACHE_MONGO_TTL_SECONDS: int = 30 * 24 * 3600
+
+    # Finished results never change: browsers may cache them for this long,
+    # and this process keeps up to RESULT_CACHE_MAX_BYTES of serialized bodies
+    RESULT_CACHE_MAX_AGE_SECONDS: int = 365 * 24 * 3600
+    RESULT_CACHE_MAX_BYTES: int = 32 * 1024 * 1024
+
+    # Idempotency-Key on POST /leads, /responses and /diagnostics: responses are replayed for
+    # IDEMPOTENCY_TTL_SECONDS. A duplicate of a request still in flight waits up
+    # to IDEMPOTENCY_WAIT_SECONDS for it; an owner that died is taken over once
+    # its IDEMPOTENCY_LOCK_SECONDS lock expires.
+    IDEMPOTENCY_TTL_SECONDS: int = 24 * 3600
+    IDEMPOTENCY_LOCK_SECONDS: int = 120
+    IDEMPOTENCY_WAIT_SECONDS: float = 60.0
+    IDEMPOTENCY_POLL_SECONDS: float = 0.5
+    IDEMPOTENCY_MAX_KEY_LENGTH: int = 255
+
+    # Admin dashboard
+    ADMIN_RESPONSES_PAGE_SIZE: int = 50
+    ADMIN_RESPONSES_MAX_PAGE_SIZE: int = 200
+
+    # Live dashboard feed (GET /admin/live): one change stream per process
+    # (needs a replica set, like transactions), fanned out to every admin.
+    # The last LIVE_BUFFER_SIZE events can be replayed after a reconnect.
+    LIVE_BUFFER_SIZE: int = 1000
+    LIVE_CLIENT_QUEUE_SIZE: int = 100
+    LIVE_HEARTBEAT_SECONDS: float = 15.0
+    LIVE_MAX_CONNECTION_SECONDS: float = 600.0
+    LIVE_RETRY_SECONDS: float = 5.0
+    # The stream stays open this long after the last admin leaves; a later
+    # dashboard starts from then on and cannot replay older events
+    LIVE_IDLE_SECONDS: float = 30.0
+
+    # Bulk lead import
+    BULK_LEADS_BATCH_SIZE: int = 500
+    BULK_LEADS_MAX_REPORTED_ERRORS: int = 1000
+
+    # Rows per cursor batch (and per streamed chunk) in /admin/export
+    EXPORT_BATCH_SIZE: int = 1000
+
+    # Serialize hot endpoints with orjson and skip response_model re-validation
+    FAST_JSON: bool = False
+    # gzip/brotli (negotiated per request) for bodies of at least COMPRESSION_MIN_SIZE bytes
+    COMPRESSION_ENABLED: bool = False
+    COMPRESSION_MIN_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+
+    # Prometheus-style /metrics endpoint and the instrumentation feeding it
+    METRICS_ENABLED: bool = True
 
     model_config = SettingsConfigDict(env_file=".env")
 
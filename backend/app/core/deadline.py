@@ -0,0 +1,141 @@
+import asyncio
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Awaitable, Dict, Optional, TypeVar
+import pymongo
+from starlette.datastructures import Headers
+from app.core.metrics import DEPENDENCY_TIMEOUTS
+
+T = TypeVar("T")
+
+# time.monotonic() by which the current request must be answered; None = no deadline
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+
+class DeadlineExceeded(Exception):
+    """
+    An outbound call was cut off because the request ran out of time.
+    """
+
+    def __init__(self, dependency: str):
+        super().__init__(f"Deadline exceeded waiting for {dependency}")
+        self.dependency = dependency
+
+
+def remaining() -> Optional[float]:
+    current = _deadline.get()
+    if current is None:
+        return None
+    return max(current - time.monotonic(), 0.0)
+
+
+@contextmanager
+def request_deadline(seconds: Optional[float]):
+    """
+    Runs the enclosed code under a deadline `seconds` from now (a nested
+    deadline can only shorten the current one). MongoDB operations inherit it
+    through pymongo.timeout, which also sets maxTimeMS on each command.
+    """
+    if not seconds or seconds <= 0:
+        yield
+        return
+    until = time.monotonic() + seconds
+    current = _deadline.get()
+    if current is not None:
+        until = min(until, current)
+    token = _deadline.set(until)
+    try:
+        with pymongo.timeout(max(until - time.monotonic(), 0.001)):
+            yield
+    finally:
+        _deadline.reset(token)
+
+
+def budget(reserve: float = 0.0, cap: Optional[float] = None) -> Optional[float]:
+    """
+    Seconds an outbound call may take: what is left of the deadline less
+    `reserve` (kept back for work after the call), at most `cap`.
+    None when there is neither a deadline nor a cap.
+    """
+    left = remaining()
+    if left is not None:
+        left = max(left - reserve, 0.0)
+    if cap is not None:
+        left = cap if left is None else min(left, cap)
+    return left
+
+
+async def call(awaitable: Awaitable[T], dependency: str, reserve: float = 0.0, cap: Optional[float] = None) -> T:
+    """
+    Awaits an outbound call within budget(reserve, cap); raises
+    DeadlineExceeded (counted per dependency) if it does not finish in time.
+    """
+    timeout = budget(reserve, cap)
+    if timeout is None:
+        return await awaitable
+    try:
+        return await asyncio.wait_for(awaitable, timeout)
+    except asyncio.TimeoutError:
+        DEPENDENCY_TIMEOUTS.inc(dependency=dependency)
+        raise DeadlineExceeded(dependency) from None
+
+
+async def iterate(source: AsyncIterator[T], dependency: str, reserve: float = 0.0) -> AsyncIterator[T]:
+    """
+    Yields from source until it ends or the deadline (less `reserve`) passes,
+    which raises DeadlineExceeded. The source is closed either way.
+    """
+    try:
+        while True:
+            try:
+                item = await call(source.__anext__(), dependency, reserve)
+            except StopAsyncIteration:
+                return
+            yield item
+    finally:
+        aclose = getattr(source, "aclose", None)
+        if aclose is not None:
+            await aclose()
+
+
+def _route_deadline(path: str, default: float, routes: Dict[str, float]) -> float:
+    # Longest matching path prefix wins
+    best = None
+    for prefix in routes:
+        if (path == prefix or path.startswith(prefix.rstrip("/") + "/")) and (best is None or len(prefix) > len(best)):
+            best = prefix
+    return routes[best] if best is not None else default
+
+
+class DeadlineMiddleware:
+    """
+    ASGI middleware giving every HTTP request a deadline: the route's
+    configured budget (by path prefix; 0 means none), or the client's
+    X-Request-Timeout header in seconds, capped at max_seconds.
+    Streaming responses run under it until their last chunk.
+    """
+
+    def __init__(self, app, default_seconds: float, max_seconds: float, routes: Optional[Dict[str, float]] = None):
+        self.app = app
+        self.default_seconds = default_seconds
+        self.max_seconds = max_seconds
+        self.routes = routes or {}
+
+    def _seconds(self, scope) -> float:
+        requested = Headers(scope=scope).get("x-request-timeout")
+        if requested:
+            try:
+                seconds = float(requested)
+            except ValueError:
+                seconds = 0.0
+            if seconds > 0:
+                return min(seconds, self.max_seconds)
+        return _route_deadline(scope["path"], self.default_seconds, self.routes)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        with request_deadline(self._seconds(scope)):
+            await self.app(scope, receive, send)
@@ -0,0 +1,282 @@
+import bisect
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, List, Sequence, Tuple
+from pymongo import monitoring
+
+# Minimal Prometheus-style metrics: counters, gauges and histograms with
+# labels, rendered in the text exposition format at /metrics.
+# Updates are a dict lookup plus an add under a lock, cheap enough to leave on.
+# The lock matters because Mongo command events arrive on driver threads.
+
+LabelValues = Tuple[str, ...]
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class _Metric(ABC):
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.label_names)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"] + self._samples()
+
+    @abstractmethod
+    def _samples(self) -> List[str]:
+        ...
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.label_names, key)} {_format_number(value)}"
+            for key, value in items
+        ]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket (+Inf last)], sum, count
+        self._values: Dict[LabelValues, list] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = [(key, list(entry[0]), entry[1], entry[2]) for key, entry in self._values.items()]
+        lines = []
+        for key, counts, total, count in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.label_names, key)} {_format_number(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.label_names, key)} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labels: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labels))
+
+    def gauge(self, name: str, documentation: str, labels: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labels))
+
+    def histogram(self, name: str, documentation: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labels, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines += metric.render()
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+HTTP_REQUESTS = registry.counter(
+    "http_requests_total", "HTTP requests by route and status code.", ("method", "route", "status")
+)
+HTTP_REQUEST_DURATION = registry.histogram(
+    "http_request_duration_seconds", "Time until the response finished, by route.", ("method", "route")
+)
+HTTP_IN_FLIGHT = registry.gauge(
+    "http_requests_in_flight", "Requests currently being handled.", ("method",)
+)
+
+MONGO_COMMAND_DURATION = registry.histogram(
+    "mongodb_command_duration_seconds", "MongoDB command round trips, by command.", ("command",),
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+MONGO_COMMAND_FAILURES = registry.counter(
+    "mongodb_command_failures_total", "MongoDB commands that returned an error.", ("command",)
+)
+
+LLM_REQUEST_DURATION = registry.histogram(
+    "llm_request_duration_seconds", "LLM completion calls, by provider, model and outcome.",
+    ("provider", "model", "outcome"),
+    buckets=(0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0),
+)
+LLM_TOKENS = registry.counter(
+    "llm_tokens_total", "Tokens reported by the provider, by kind (prompt or completion).",
+    ("provider", "model", "kind")
+)
+LLM_CALL_TOKENS = registry.histogram(
+    "llm_call_tokens", "Tokens per analysis call, by prompt template version and kind (prompt or completion).",
+    ("prompt_version", "kind"),
+    buckets=(50, 100, 200, 400, 800, 1600, 3200, 6400),
+)
+ANALYSIS_PARSES = registry.counter(
+    "analysis_parses_total", "Model outputs parsed, by outcome (clean, repaired or failed).", ("outcome",)
+)
+DEPENDENCY_TIMEOUTS = registry.counter(
+    "dependency_timeouts_total", "Outbound calls cut off by a deadline or timeout, by dependency (llm, mongo or email).",
+    ("dependency",)
+)
+ANALYSIS_RESULTS = registry.counter(
+    "analysis_results_total", "Analyses produced, by source (cache, llm or fallback) and mode.", ("source", "mode")
+)
+
+ADMISSION_IN_FLIGHT = registry.gauge(
+    "admission_in_flight", "Calls holding a slot, by limiter.", ("limiter",)
+)
+ADMISSION_QUEUE_DEPTH = registry.gauge(
+    "admission_queue_depth", "Calls waiting for a slot, by limiter.", ("limiter",)
+)
+ADMISSION_WAIT = registry.histogram(
+    "admission_wait_seconds", "Time spent waiting for a slot (admitted calls), by limiter.", ("limiter",),
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+ADMISSION_REJECTIONS = registry.counter(
+    "admission_rejections_total", "Calls turned away, by limiter and reason (queue_full, timeout or deadline).",
+    ("limiter", "reason")
+)
+
+LIVE_SUBSCRIBERS = registry.gauge(
+    "live_feed_subscribers", "Admin dashboards connected to the live feed."
+)
+LIVE_EVENTS = registry.counter(
+    "live_feed_events_total", "Change events fanned out to the live feed, by event.", ("event",)
+)
+
+RESULT_CACHE_LOOKUPS = registry.counter(
+    "result_cache_lookups_total", "GET /results payload cache lookups, by outcome (hit or miss).", ("outcome",)
+)
+
+EMAIL_SENDS = registry.counter(
+    "email_send_total", "Email delivery attempts, by outcome (sent, retry or dead).", ("outcome",)
+)
+EMAIL_SEND_DURATION = registry.histogram(
+    "email_send_duration_seconds", "Time to hand a message to the email provider."
+)
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """
+    Times every command the driver sends. The driver measures the duration
+    itself, so started events need no bookkeeping.
+    """
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        MONGO_COMMAND_DURATION.observe(event.duration_micros / 1e6, command=event.command_name)
+
+    def failed(self, event):
+        MONGO_COMMAND_DURATION.observe(event.duration_micros / 1e6, command=event.command_name)
+        MONGO_COMMAND_FAILURES.inc(command=event.command_name)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording per-route latency and status codes, plus the
+    number of requests in flight. Routes are labelled by their template
+    (/results/{result_id}), never the raw path, so label cardinality stays
+    bounded. Streaming responses are timed until their last chunk is sent.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc(method=method)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            HTTP_IN_FLIGHT.dec(method=method)
+            # The router stores the matched route in the (shared) scope
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            HTTP_REQUEST_DURATION.observe(elapsed, method=method, route=route)
+            HTTP_REQUESTS.inc(method=method, route=route, status=str(status_code))
@@ -0,0 +1,35 @@
+from typing import List, Optional
+from pydantic import BaseModel
+
+# Backend copy of the diagnostic catalog in frontend/src/data/questions.ts.
+# Answers are stored keyed by these ids; keep both files in sync.
+
+class Question(BaseModel):
+    id: str
+    text: str
+    type: str
+    options: Optional[List[str]] = None
+    # Short topic used in LLM prompts instead of the full question text
+    label: str
+
+QUESTIONS: List[Question] = [
+    Question(id="q1", label="biggest challenge", type="text", text="What is the single biggest challenge your company is currently facing?"),
+    Question(id="q2", label="product-market fit confidence", type="radio", text="How confident are you in your current product-market fit?",
+             options=["Very Confident", "Moderately Confident", "Slightly Confident", "Not Confident"]),
+    Question(id="q3", label="main acquisition channel", type="text", text="Describe your primary customer acquisition channel."),
+    Question(id="q4", label="team alignment with vision", type="radio", text="On a scale of 1-5, how aligned is your team with the company's long-term vision?",
+             options=["1 - Not Aligned", "2 - Somewhat Aligned", "3 - Moderately Aligned", "4 - Well Aligned", "5 - Perfectly Aligned"]),
+    Question(id="q5", label="operational bottleneck", type="text", text="What is your biggest operational bottleneck right now?"),
+    Question(id="q6", label="delegation effectiveness", type="radio", text="How effectively do you delegate tasks to your team?",
+             options=["Very Effectively", "Moderately Effectively", "Sometimes Effectively", "Not Effectively At All"]),
+    Question(id="q7", label="wants clarity on", type="text", text="What's one thing you wish you had more clarity on regarding your business?"),
+    Question(id="q8", label="KPI review frequency", type="radio", text="How often do you review your company's key performance indicators (KPIs)?",
+             options=["Daily", "Weekly", "Monthly", "Quarterly", "Rarely"]),
+    Question(id="q9", label="personal founder challenge", type="text", text="What's your current biggest personal challenge as a founder?"),
+    Question(id="q10", label="culture in three words", type="text", text="How would you describe your company culture in three words?"),
+    Question(id="q11", label="12-month strategic plan", type="radio", text="Do you have a clear, documented 12-month strategic plan?",
+             options=["Yes, it's very clear", "Yes, but it needs refinement", "Partially, it's in my head", "No, not yet"]),
+    Question(id="q12", label="most excited about", type="text", text="What's one thing you're most excited about for your company's future?"),
+]
+
+QUESTION_IDS: List[str] = [q.id for q in QUESTIONS]
@@ -0,0 +1,31 @@
+from typing import Any, Optional
+import orjson
+from fastapi import Response
+from fastapi.responses import JSONResponse
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse rendered with orjson. Handles datetimes natively and
+    stringifies anything else it does not know (e.g. ObjectId).
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=str, option=orjson.OPT_NON_STR_KEYS)
+
+
+def fast_json(content: Any, response: Optional[Response] = None, status_code: int = 200) -> FastJSONResponse:
+    """
+    Returns content as-is, skipping FastAPI's response_model validation and
+    re-serialization. Only for payloads the endpoint built itself in the
+    response_model's exact shape. Status code and headers set on the
+    injected `response` are carried over.
+    """
+    if response is not None and response.status_code:
+        status_code = response.status_code
+    fast = FastJSONResponse(content, status_code=status_code)
+    if response is not None:
+        for name, value in response.headers.items():
+            if name not in ("content-length", "content-type"):
+                fast.headers[name] = value
+    return fast
@@ -1,12 +1,99 @@
-from motor.motor_asyncio import AsyncIOMotorClient
+from typing import Optional
+from motor import motor_asyncio
+from pymongo.read_preferences import read_pref_mode_from_name, make_read_preference
 from app.core.config import settings
+from app.core.metrics import MongoCommandMetrics
+
+_client: Optional[motor_asyncio.AsyncIOMotorClient] = None
+
+
+def _client_options() -> dict:
+    options = {
+        "maxPoolSize": settings.MONGODB_MAX_POOL_SIZE,
+        "minPoolSize": settings.MONGODB_MIN_POOL_SIZE,
+        "maxIdleTimeMS": settings.MONGODB_MAX_IDLE_TIME_MS,
+        "connectTimeoutMS": settings.MONGODB_CONNECT_TIMEOUT_MS,
+        "serverSelectionTimeoutMS": settings.MONGODB_SERVER_SELECTION_TIMEOUT_MS,
+        "readPreference": settings.MONGODB_READ_PREFERENCE,
+    }
+    if settings.METRICS_ENABLED:
+        options["event_listeners"] = [MongoCommandMetrics()]
+    if settings.MONGODB_SOCKET_TIMEOUT_MS:
+        options["socketTimeoutMS"] = settings.MONGODB_SOCKET_TIMEOUT_MS
+    if settings.MONGODB_WAIT_QUEUE_TIMEOUT_MS:
+        options["waitQueueTimeoutMS"] = settings.MONGODB_WAIT_QUEUE_TIMEOUT_MS
+    if settings.MONGODB_COMPRESSORS:
+        # The server picks the first one it also supports; pymongo skips
+        # (with a warning) any whose library is not installed
+        options["compressors"] = ",".join(settings.MONGODB_COMPRESSORS)
+        options["zlibCompressionLevel"] = settings.MONGODB_ZLIB_COMPRESSION_LEVEL
+    return options
+
+
+def connect(**overrides) -> motor_asyncio.AsyncIOMotorClient:
+    """
+    Creates the shared client; called once from the app lifespan (and by
+    scripts). overrides replace individual client options, e.g. maxPoolSize.
+    """
+    global _client
+    if _client is None:
+        _client = motor_asyncio.AsyncIOMotorClient(settings.MONGODB_URL, **{**_client_options(), **overrides})
+    return _client
+
+
+def close():
+    global _client
+    if _client is not None:
+        _client.close()
+        _client = None
+
+
+def get_client() -> motor_asyncio.AsyncIOMotorClient:
+    if _client is None:
+        raise RuntimeError("MongoDB client is not connected; call app.db.database.connect() first")
+    return _client
+
+
+def _admin_read_preference():
+    mode = read_pref_mode_from_name(settings.MONGODB_ADMIN_READ_PREFERENCE)
+    staleness = settings.MONGODB_ADMIN_MAX_STALENESS_SECONDS
+    # maxStalenessSeconds is not allowed with primary reads
+    if mode == 0 or staleness <= 0:
+        return make_read_preference(mode, None)
+    return make_read_preference(mode, None, max_staleness=staleness)
+
+
+class _Database:
+    """
+    Stands in for the Motor database so modules can keep importing `db` at
+    import time while the client itself is created in the lifespan.
+    """
+
+    def __init__(self, admin_reads: bool = False):
+        self._admin_reads = admin_reads
+
+    def _database(self):
+        database = get_client()[settings.DATABASE_NAME]
+        if self._admin_reads:
+            return database.with_options(read_preference=_admin_read_preference())
+        return database
+
+    def __getattr__(self, name):
+        return getattr(self._database(), name)
+
+    def __getitem__(self, name):
+        return self._database()[name]
+
+
+db = _Database()
+# Reads for admin-only views (listing, export, dashboard stats). These may go
+# to secondaries and lag the primary slightly; never write through it.
+admin_read_db = _Database(admin_reads=True)
 
-client = AsyncIOMotorClient(settings.MONGODB_URL)
-db = client[settings.DATABASE_NAME]
 
 async def check_db_connection():
     try:
-        await client.admin.command('ismaster')
+        await get_client().admin.command('ismaster')
         return True, None
     except Exception as e:
         return False, str(e)  # or repr(e) if you want full detail
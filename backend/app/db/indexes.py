@@ -0,0 +1,179 @@
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+from app.db.database import db
+from app.db.queries import lead_lookup_stages
+
+logger = logging.getLogger(__name__)
+
+# Indexes the hot queries rely on, per collection. Collections owned by a
+# service (analysis_cache, email_outbox) declare theirs in that service.
+INDEXES: Dict[str, List[IndexModel]] = {
+    "responses": [
+        # Admin listing and export: newest/oldest first, keyset-paged on (created_at, _id)
+        IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)], name="created_at_id"),
+        IndexModel([("lead_id", ASCENDING)], name="lead_id"),
+        # Orphan sweep of the analysis workers; only pending responses are indexed
+        IndexModel(
+            [("status", ASCENDING), ("created_at", ASCENDING)],
+            name="pending_created_at", partialFilterExpression={"status": "pending"},
+        ),
+    ],
+    "leads": [
+        # One lead per email; bulk import dedupes against it
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+    ],
+    "admins": [
+        # Login and token resolution look admins up by email
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+    ],
+    "analysis_jobs": [
+        # Workers claim by status, oldest run_after first
+        IndexModel([("status", ASCENDING), ("run_after", ASCENDING)], name="status_run_after"),
+        # One job per response; also how the orphan sweep finds responses without one
+        IndexModel([("response_id", ASCENDING)], name="response_id_unique", unique=True),
+    ],
+}
+
+
+async def ensure_indexes():
+    """
+    Creates any missing index. Existing indexes are left alone, so this is
+    cheap on every startup. A failure (e.g. duplicate emails blocking a unique
+    index) is logged instead of stopping the app.
+    """
+    for collection, models in INDEXES.items():
+        try:
+            await db[collection].create_indexes(models)
+        except OperationFailure as e:
+            logger.error(f"Could not create indexes on {collection}: {e}")
+
+
+async def duplicate_lead_emails(limit: Optional[int] = 20) -> List[dict]:
+    """
+    Emails held by more than one lead, most duplicated first, as
+    {"email", "count", "ids"}. Any of them keeps the unique email index
+    from being built (ensure_indexes only logs that).
+    """
+    pipeline = [
+        {"$group": {"_id": "$email", "count": {"$sum": 1}, "ids": {"$push": "$_id"}}},
+        {"$match": {"count": {"$gt": 1}}},
+        {"$sort": {"count": -1}},
+    ]
+    if limit:
+        pipeline.append({"$limit": limit})
+    return [
+        {"email": doc["_id"], "count": doc["count"], "ids": doc["ids"]}
+        async for doc in db.leads.aggregate(pipeline, allowDiskUse=True)
+    ]
+
+
+async def merge_duplicate_leads() -> int:
+    """
+    Keeps the oldest lead of each duplicated email, moves the responses of
+    the others to it and deletes them. Returns how many leads were deleted.
+    Dashboard counters need reconcile_stats() afterwards.
+    """
+    deleted = 0
+    for duplicate in await duplicate_lead_emails(limit=None):
+        # ObjectIds sort by creation time
+        keep, *others = sorted(duplicate["ids"])
+        await db.responses.update_many(
+            {"lead_id": {"$in": [str(lead_id) for lead_id in others]}}, {"$set": {"lead_id": str(keep)}}
+        )
+        result = await db.leads.delete_many({"_id": {"$in": others}})
+        deleted += result.deleted_count
+    return deleted
+
+
+def _hot_queries() -> List[Tuple[str, Dict[str, Any]]]:
+    # Shapes match the production queries; the values are placeholders
+    now = datetime.utcnow()
+    oid = ObjectId()
+    return [
+        ("admin responses, first page", {
+            "aggregate": "responses",
+            "pipeline": [
+                {"$sort": {"created_at": -1, "_id": -1}},
+                {"$limit": 51},
+                *lead_lookup_stages(),
+            ],
+            "cursor": {},
+        }),
+        ("admin responses, next page", {
+            "aggregate": "responses",
+            "pipeline": [
+                {"$match": {"$or": [
+                    {"created_at": {"$lt": now}},
+                    {"created_at": now, "_id": {"$lt": oid}},
+                ]}},
+                {"$sort": {"created_at": -1, "_id": -1}},
+                {"$limit": 51},
+            ],
+            "cursor": {},
+        }),
+        ("responses export by date range", {
+            "aggregate": "responses",
+            "pipeline": [
+                {"$match": {"created_at": {"$gte": now, "$lt": now}}},
+                {"$sort": {"created_at": 1, "_id": 1}},
+            ],
+            "cursor": {},
+        }),
+        ("responses by lead", {"find": "responses", "filter": {"lead_id": str(oid)}}),
+        ("admin by email", {"find": "admins", "filter": {"email": "admin@example.com"}, "limit": 1}),
+        ("lead by id", {"find": "leads", "filter": {"_id": oid}, "limit": 1}),
+        ("leads by email (bulk import)", {"find": "leads", "filter": {"email": {"$in": ["a@example.com"]}}}),
+        ("analysis job claim", {
+            "find": "analysis_jobs",
+            "filter": {"$or": [
+                {"status": "pending", "run_after": {"$lte": now}},
+                {"status": "running", "locked_until": {"$lt": now}},
+            ]},
+            "sort": {"run_after": 1},
+            "limit": 1,
+        }),
+        ("email outbox claim", {
+            "find": "email_outbox",
+            "filter": {"$or": [
+                {"status": "pending", "next_attempt_at": {"$lte": now}},
+                {"status": "sending", "locked_until": {"$lt": now}},
+            ]},
+            "sort": {"next_attempt_at": 1},
+            "limit": 50,
+        }),
+    ]
+
+
+def _stages(plan: Any) -> List[str]:
+    # Every "stage" name anywhere in an explain document
+    found = []
+    if isinstance(plan, dict):
+        if isinstance(plan.get("stage"), str):
+            found.append(plan["stage"])
+        for value in plan.values():
+            found += _stages(value)
+    elif isinstance(plan, list):
+        for value in plan:
+            found += _stages(value)
+    return found
+
+
+async def explain_hot_queries() -> List[dict]:
+    """
+    Runs explain (queryPlanner) on every hot query and reports the plan
+    stages used. ok is False when any of them scans a whole collection.
+    """
+    results = []
+    for name, command in _hot_queries():
+        explain = await db.command("explain", command, verbosity="queryPlanner")
+        stages = _stages(explain)
+        results.append({
+            "query": name,
+            "stages": stages,
+            "ok": "COLLSCAN" not in stages,
+        })
+    return results
@@ -0,0 +1,23 @@
+from typing import Any, Dict, List, Sequence
+
+# Aggregation building blocks shared by the admin endpoints.
+
+def lead_lookup_stages(fields: Sequence[str] = ("name", "email")) -> List[Dict[str, Any]]:
+    """
+    Joins each response with its lead in the same aggregation, as "lead".
+    lead_id is stored as a string, so it is converted before matching on _id.
+    """
+    return [
+        {"$lookup": {
+            "from": "leads",
+            "let": {"lead_oid": {"$convert": {
+                "input": "$lead_id", "to": "objectId", "onError": None, "onNull": None
+            }}},
+            "pipeline": [
+                {"$match": {"$expr": {"$eq": ["$_id", "$$lead_oid"]}}},
+                {"$project": {"_id": 0, **{field: 1 for field in fields}}},
+            ],
+            "as": "lead",
+        }},
+        {"$unwind": {"path": "$lead", "preserveNullAndEmptyArrays": True}},
+    ]
@@ -1,22 +1,113 @@
-from fastapi import FastAPI
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
+from pymongo.errors import PyMongoError
+from app.core.admission import AdmissionRejected
+from app.core.compression import CompressionMiddleware
 from app.core.config import settings
+from app.core.deadline import DeadlineExceeded, DeadlineMiddleware
+from app.core.metrics import DEPENDENCY_TIMEOUTS, MetricsMiddleware, registry
+from app.core.responses import FastJSONResponse
+from app.db import database
 from app.db.database import check_db_connection
-from app.routers import auth, leads, responses, admin
+from app.db.indexes import ensure_indexes
+from app.routers import auth, leads, responses, diagnostics, admin
+from app.services import analysis_cache, analysis_jobs, email_outbox, idempotency, stats_service
 
-app = FastAPI(title=settings.PROJECT_NAME)
+logger = logging.getLogger(__name__)
 
+async def _startup_maintenance():
+    # Several round trips even when every index exists, so it runs in the
+    # background instead of delaying the first request after a cold start
+    try:
+        await ensure_indexes()
+        await analysis_cache.ensure_indexes()
+        await email_outbox.ensure_indexes()
+        await idempotency.ensure_indexes()
+    except Exception as e:
+        logger.error(f"Could not ensure indexes: {e}")
+    try:
+        await stats_service.ensure_stats()
+    except Exception as e:
+        logger.error(f"Could not build dashboard stats: {e}")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Creating the client does not connect; that happens on first use
+    database.connect()
+    maintenance = asyncio.create_task(_startup_maintenance())
+    if settings.ANALYSIS_MODE == "job":
+        analysis_jobs.start_workers()
+    email_outbox.start_sender()
+    yield
+    maintenance.cancel()
+    await email_outbox.stop_sender()
+    await analysis_jobs.stop_workers()
+    database.close()
+
+app = FastAPI(
+    title=settings.PROJECT_NAME,
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse if settings.FAST_JSON else JSONResponse,
+)
+
+app.add_middleware(
+    DeadlineMiddleware,
+    default_seconds=settings.REQUEST_DEADLINE_SECONDS,
+    max_seconds=settings.REQUEST_DEADLINE_MAX_SECONDS,
+    routes=settings.REQUEST_DEADLINE_ROUTES,
+)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.ALLOWED_ORIGINS,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Idempotent-Replayed", "Retry-After"],
 )
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MIN_SIZE,
+        gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+        brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+    )
+if settings.METRICS_ENABLED:
+    # Added last so it wraps everything, CORS preflights included
+    app.add_middleware(MetricsMiddleware)
+
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected_handler(request: Request, exc: AdmissionRejected):
+    return JSONResponse(
+        status_code=429,
+        content={"detail": "The analysis service is busy, please retry shortly"},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+@app.exception_handler(idempotency.IdempotencyError)
+async def idempotency_error_handler(request: Request, exc: idempotency.IdempotencyError):
+    headers = {"Retry-After": str(exc.retry_after)} if exc.retry_after is not None else None
+    return JSONResponse(status_code=exc.status_code, content={"detail": exc.detail}, headers=headers)
+
+@app.exception_handler(DeadlineExceeded)
+async def deadline_exceeded_handler(request: Request, exc: DeadlineExceeded):
+    return JSONResponse(status_code=504, content={"detail": "The request timed out"})
+
+@app.exception_handler(PyMongoError)
+async def mongo_error_handler(request: Request, exc: PyMongoError):
+    # Timeouts include the request deadline applied through pymongo.timeout
+    if not exc.timeout:
+        raise exc
+    DEPENDENCY_TIMEOUTS.inc(dependency="mongo")
+    return JSONResponse(status_code=504, content={"detail": "The request timed out"})
 
 app.include_router(auth.router)
 app.include_router(leads.router)
 app.include_router(responses.router)
+app.include_router(diagnostics.router)
 app.include_router(admin.router)
 
 @app.get("/healthz")
@@ -34,3 +125,9 @@ async def health_check():
         "db": "disconnected",
         "error": error
     }
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,14 @@
+from pydantic import BaseModel
+from typing import Dict, Any, Optional
+from app.models.lead import LeadBase
+
+class DiagnosticCreate(LeadBase):
+    # Keyed by question id, as in ResponseCreate
+    answers: Dict[str, Any]
+
+class DiagnosticResponse(BaseModel):
+    lead_id: str
+    result_id: str
+    # Same meaning as AnalysisResponse.status
+    status: str = "done"
+    analysis: Optional[Dict[str, Any]] = None
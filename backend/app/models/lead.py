@@ -1,6 +1,6 @@
 from pydantic import BaseModel, EmailStr, Field, ConfigDict
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 class LeadBase(BaseModel):
     name: str
@@ -17,4 +17,17 @@ class LeadInDB(LeadBase):
     model_config = ConfigDict(populate_by_name=True)
 
 class LeadResponse(BaseModel):
-    id: str
\ No newline at end of file
+    id: str
+
+class BulkLeadError(BaseModel):
+    row: int
+    error: str
+
+class BulkLeadsResponse(BaseModel):
+    received: int
+    inserted: int
+    duplicates: int
+    failed: int
+    errors: List[BulkLeadError]
+    # True when more rows failed than are listed in errors
+    errors_truncated: bool
\ No newline at end of file
@@ -15,4 +15,8 @@ class ResponseInDB(ResponseCreate):
 
 class AnalysisResponse(BaseModel):
     result_id: str
-    analysis: Dict[str, Any]
\ No newline at end of file
+    # "pending" while a background job is still generating the analysis,
+    # "done" once it is available (the fallback analysis if every attempt
+    # failed), "failed" for results from before the fallback was stored.
+    status: str = "done"
+    analysis: Optional[Dict[str, Any]] = None
\ No newline at end of file
@@ -1,17 +1,43 @@
-from typing import Annotated, List, Dict, Any
-from fastapi import APIRouter, Depends
+import base64
+import json
+from typing import Annotated, List, Dict, Any, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from app.core.config import settings
+from app.core.responses import fast_json
 from app.routers.auth import get_current_admin
-from app.db.database import db
+from app.db.database import admin_read_db
+from app.db.queries import lead_lookup_stages
+from app.services import analysis_cache, email_outbox, export_service, live_feed, stats_service
+from app.services.ai_service import llm_admission
+from app.services.llm_router import llm_router
 from pydantic import BaseModel
 from datetime import datetime
 from bson import ObjectId
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
+class MonthlyCompletion(BaseModel):
+    month: str
+    completions: int
+
 class StatsResponse(BaseModel):
     total_leads: int
     total_responses: int
     completion_rate: float
+    monthly_completions: List[MonthlyCompletion]
+
+class CacheStatsResponse(BaseModel):
+    memory_hits: int
+    mongo_hits: int
+    misses: int
+    stores: int
+    memory_entries: int
+    hit_rate: float
+    prompt_version: str
+
+class CacheInvalidateResponse(BaseModel):
+    deleted: int
 
 class AdminResponseItem(BaseModel):
     id: str
@@ -22,41 +48,146 @@ class AdminResponseItem(BaseModel):
 
 @router.get("/stats", response_model=StatsResponse)
 async def get_stats(current_admin: Annotated[dict, Depends(get_current_admin)]):
-    total_leads = await db.leads.count_documents({})
-    total_responses = await db.responses.count_documents({})
+    # Counters are maintained on write; see stats_service.reconcile_stats()
+    stats = await stats_service.get_dashboard_stats()
+    total_leads = stats["total_leads"]
+    total_responses = stats["total_responses"]
     
     completion_rate = 0.0
     if total_leads > 0:
         completion_rate = (total_responses / total_leads) * 100
         
-    return {
+    result = {
         "total_leads": total_leads,
         "total_responses": total_responses,
-        "completion_rate": round(completion_rate, 2)
+        "completion_rate": round(completion_rate, 2),
+        "monthly_completions": stats["monthly_completions"]
     }
+    if settings.FAST_JSON:
+        return fast_json(result)
+    return result
+
+def _encode_cursor(created_at: datetime, response_id: ObjectId) -> str:
+    raw = json.dumps({"c": created_at.isoformat(), "i": str(response_id)})
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+def _decode_cursor(cursor: str):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(data["c"]), ObjectId(data["i"])
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
 
 @router.get("/responses", response_model=List[AdminResponseItem])
-async def get_responses(current_admin: Annotated[dict, Depends(get_current_admin)]):
-    # Fetch latest 50 responses
-    cursor = db.responses.find().sort("created_at", -1).limit(50)
-    responses_list = await cursor.to_list(length=50)
-    
-    result = []
-    for resp in responses_list:
-        lead_id = resp.get("lead_id")
-        lead = None
-        if lead_id:
-            try:
-                lead = await db.leads.find_one({"_id": ObjectId(lead_id)})
-            except:
-                pass 
-        
-        result.append({
-            "id": str(resp["_id"]),
-            "name": lead["name"] if lead else "Unknown",
-            "email": lead["email"] if lead else "Unknown",
-            "answers": resp.get("answers", {}),
-            "created_at": resp.get("created_at")
-        })
-        
-    return result
\ No newline at end of file
+async def get_responses(
+    current_admin: Annotated[dict, Depends(get_current_admin)],
+    http_response: Response,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=settings.ADMIN_RESPONSES_MAX_PAGE_SIZE)
+):
+    # Newest first, paged by (created_at, _id) so deep pages cost the same as the first.
+    # The next page's cursor is returned in the X-Next-Cursor header.
+    page_size = limit or settings.ADMIN_RESPONSES_PAGE_SIZE
+
+    pipeline = []
+    if cursor:
+        created_at, response_id = _decode_cursor(cursor)
+        pipeline.append({"$match": {"$or": [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "_id": {"$lt": response_id}},
+        ]}})
+    pipeline += [
+        {"$sort": {"created_at": -1, "_id": -1}},
+        {"$limit": page_size + 1},
+        {"$project": {"lead_id": 1, "answers": 1, "created_at": 1}},
+        *lead_lookup_stages(),
+        {"$project": {
+            "_id": 1,
+            "answers": {"$ifNull": ["$answers", {}]},
+            "created_at": 1,
+            "name": {"$ifNull": ["$lead.name", "Unknown"]},
+            "email": {"$ifNull": ["$lead.email", "Unknown"]},
+        }},
+    ]
+
+    docs = await admin_read_db.responses.aggregate(pipeline).to_list(length=page_size + 1)
+    if len(docs) > page_size:
+        docs = docs[:page_size]
+        http_response.headers["X-Next-Cursor"] = _encode_cursor(docs[-1]["created_at"], docs[-1]["_id"])
+
+    items = [
+        {
+            "id": str(doc["_id"]),
+            "name": doc["name"],
+            "email": doc["email"],
+            "answers": doc["answers"],
+            "created_at": doc["created_at"]
+        }
+        for doc in docs
+    ]
+    if settings.FAST_JSON:
+        # Built straight from the projection above, already in AdminResponseItem shape
+        return fast_json(items, http_response)
+    return items
+
+@router.get("/export")
+async def export_responses(
+    current_admin: Annotated[dict, Depends(get_current_admin)],
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    gzip: bool = False
+):
+    # Streams straight from a Mongo cursor; nothing is buffered beyond one batch
+    extension = "csv" if format == "csv" else "ndjson"
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    if gzip:
+        extension += ".gz"
+        media_type = "application/gzip"
+
+    filename = f"responses-{datetime.utcnow():%Y%m%d-%H%M%S}.{extension}"
+    return StreamingResponse(
+        export_service.export_responses(format, start, end, compress=gzip),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+@router.get("/live")
+async def live_updates(
+    current_admin: Annotated[dict, Depends(get_current_admin)],
+    last_event_id: Optional[str] = Header(None)
+):
+    # Server-Sent Events: lead.created, response.created and response.updated
+    # from one change stream shared by all admins (see live_feed)
+    return StreamingResponse(
+        live_feed.stream(last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/analysis-cache", response_model=CacheStatsResponse)
+async def get_analysis_cache_stats(current_admin: Annotated[dict, Depends(get_current_admin)]):
+    return analysis_cache.cache_stats()
+
+@router.delete("/analysis-cache", response_model=CacheInvalidateResponse)
+async def invalidate_analysis_cache(
+    current_admin: Annotated[dict, Depends(get_current_admin)],
+    all_versions: bool = False
+):
+    # By default only entries from other prompt versions are dropped
+    deleted = await analysis_cache.invalidate(all_versions=all_versions)
+    return {"deleted": deleted}
+
+@router.get("/email-outbox")
+async def get_email_outbox_stats(current_admin: Annotated[dict, Depends(get_current_admin)]):
+    return await email_outbox.outbox_stats()
+
+@router.get("/llm-providers")
+async def get_llm_provider_stats(current_admin: Annotated[dict, Depends(get_current_admin)]):
+    return llm_router.snapshot()
+
+@router.get("/llm-admission")
+async def get_llm_admission_stats(current_admin: Annotated[dict, Depends(get_current_admin)]):
+    # Live limiter state; wait-time histograms are on /metrics
+    return llm_admission.snapshot()
@@ -3,9 +3,11 @@ from typing import Annotated
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
+from pymongo.errors import DuplicateKeyError
 from app.core.config import settings
-from app.core.security import get_password_hash, verify_password, create_access_token
+from app.core.security import get_password_hash_async, verify_and_update_password, create_access_token
 from app.db.database import db
+from app.services import admin_cache
 from app.models.admin import AdminCreate, AdminLogin, AdminResponse, Token, AdminInDB, TokenData
 
 router = APIRouter(prefix="/auth", tags=["auth"])
@@ -17,6 +19,10 @@ async def get_current_admin(token: Annotated[str, Depends(oauth2_scheme)]):
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+    admin = admin_cache.get_cached_admin(token)
+    if admin is not None:
+        return admin
+
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         email: str = payload.get("sub")
@@ -26,12 +32,14 @@ async def get_current_admin(token: Annotated[str, Depends(oauth2_scheme)]):
     except JWTError:
         raise credentials_exception
     
-    admin = await db.admins.find_one({"email": token_data.email})
+    # The password hash is not needed past login; keep it out of the cache
+    admin = await db.admins.find_one({"email": token_data.email}, {"hashed_password": 0})
     if admin is None:
         raise credentials_exception
     # Convert ObjectId to string for Pydantic compatibility if needed, 
     # though Pydantic v2 often handles str(ObjectId) automatically via coercion
     admin["_id"] = str(admin["_id"])
+    admin_cache.cache_admin(token, admin, payload.get("exp"))
     return admin
 
 @router.post("/signup", response_model=AdminResponse, status_code=status.HTTP_201_CREATED)
@@ -45,7 +53,7 @@ async def signup(admin_in: AdminCreate):
         )
     
     # Hash password
-    hashed_password = get_password_hash(admin_in.password)
+    hashed_password = await get_password_hash_async(admin_in.password)
     
     # Create admin document
     admin_data = AdminInDB(
@@ -53,7 +61,14 @@ async def signup(admin_in: AdminCreate):
         hashed_password=hashed_password
     )
     
-    result = await db.admins.insert_one(admin_data.model_dump(by_alias=True))
+    try:
+        result = await db.admins.insert_one(admin_data.model_dump(by_alias=True))
+    except DuplicateKeyError:
+        # Lost a race with a concurrent signup for the same email
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already registered"
+        )
     
     # Fetch created admin
     new_admin = await db.admins.find_one({"_id": result.inserted_id})
@@ -63,12 +78,23 @@ async def signup(admin_in: AdminCreate):
 @router.post("/login", response_model=Token)
 async def login(admin_in: AdminLogin):
     admin = await db.admins.find_one({"email": admin_in.email})
-    if not admin or not verify_password(admin_in.password, admin["hashed_password"]):
+    valid, new_hash = (False, None)
+    if admin:
+        valid, new_hash = await verify_and_update_password(admin_in.password, admin["hashed_password"])
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+
+    # Transparently upgrade hashes made with older Argon2 parameters
+    if new_hash:
+        await db.admins.update_one(
+            {"_id": admin["_id"], "hashed_password": admin["hashed_password"]},
+            {"$set": {"hashed_password": new_hash}}
+        )
+        admin_cache.evict_admin(admin["email"])
     
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
@@ -0,0 +1,125 @@
+from typing import Optional, Tuple
+from fastapi import APIRouter, Header, Response, status
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from bson import ObjectId
+from datetime import datetime
+from app.core.config import settings
+from app.core.responses import fast_json
+from app.db.database import db, get_client
+from app.models.diagnostic import DiagnosticCreate, DiagnosticResponse
+from app.services import analysis_jobs, idempotency, stats_service
+from app.services.ai_service import generate_analysis
+from app.services.analysis_jobs import STATUS_DONE, STATUS_PENDING
+
+router = APIRouter()
+
+async def _upsert_lead(diagnostic: DiagnosticCreate, created_at: datetime, session) -> Tuple[ObjectId, bool]:
+    """
+    Returns (lead_id, created). A returning visitor (same email) keeps their
+    lead, updated with the details they just entered (as POST /leads does).
+    """
+    lead_id = ObjectId()
+    email = diagnostic.email
+    details = {"$set": diagnostic.model_dump(exclude={"answers", "email"})}
+    # The id is chosen here so the pre-image tells us whether we inserted
+    update = {**details, "$setOnInsert": {"_id": lead_id, "created_at": created_at}}
+    try:
+        existing = await db.leads.find_one_and_update(
+            {"email": email}, update,
+            upsert=True, projection={"_id": 1}, return_document=ReturnDocument.BEFORE, session=session
+        )
+    except DuplicateKeyError:
+        # A concurrent upsert of the same email won the race: it exists now.
+        # Inside a transaction the error has aborted it; _write starts over.
+        if session is not None:
+            raise
+        existing = await db.leads.find_one_and_update({"email": email}, details, projection={"_id": 1})
+        if existing is None:
+            raise
+    if existing is None:
+        return lead_id, True
+    return existing["_id"], False
+
+async def _write_documents(diagnostic: DiagnosticCreate, response_dict: dict, session) -> Tuple[ObjectId, bool, ObjectId]:
+    lead_id, lead_created = await _upsert_lead(diagnostic, response_dict["created_at"], session)
+    response_dict["lead_id"] = str(lead_id)
+    new_response = await db.responses.insert_one(response_dict, session=session)
+    if response_dict["status"] == STATUS_PENDING:
+        await analysis_jobs.enqueue_analysis(new_response.inserted_id, session=session)
+    return lead_id, lead_created, new_response.inserted_id
+
+async def _write(diagnostic: DiagnosticCreate, response_dict: dict) -> Tuple[ObjectId, bool, ObjectId]:
+    """
+    Writes the lead, the response and (in job mode) the analysis job, in one
+    transaction when MONGODB_USE_TRANSACTIONS is on (needs a replica set).
+    """
+    if not settings.MONGODB_USE_TRANSACTIONS:
+        return await _write_documents(diagnostic, response_dict, None)
+
+    async with await get_client().start_session() as session:
+        # with_transaction retries the callback on transient errors, so it
+        # must start from a fresh copy of the document each time
+        try:
+            return await session.with_transaction(
+                lambda s: _write_documents(diagnostic, dict(response_dict), s)
+            )
+        except DuplicateKeyError:
+            # Lost an upsert race on the email; the retry finds that lead
+            return await session.with_transaction(
+                lambda s: _write_documents(diagnostic, dict(response_dict), s)
+            )
+
+async def _submit(diagnostic: DiagnosticCreate) -> Tuple[int, dict]:
+    response_dict = {"answers": diagnostic.answers, "created_at": datetime.utcnow()}
+
+    if settings.ANALYSIS_MODE == "job":
+        response_dict["result_analysis"] = None
+        response_dict["status"] = STATUS_PENDING
+    else:
+        # The analysis needs only the answers, so it runs before anything is written
+        response_dict["result_analysis"] = await generate_analysis(diagnostic.answers)
+        response_dict["status"] = STATUS_DONE
+
+    lead_id, lead_created, result_id = await _write(diagnostic, response_dict)
+
+    # Counters are best-effort and kept out of the transaction (see stats_service)
+    if lead_created:
+        await stats_service.record_leads(created_at=response_dict["created_at"])
+    await stats_service.record_responses(created_at=response_dict["created_at"])
+
+    if response_dict["status"] == STATUS_PENDING:
+        # The job only became visible on commit
+        analysis_jobs.notify_workers()
+        status_code = status.HTTP_202_ACCEPTED
+    else:
+        status_code = status.HTTP_201_CREATED
+
+    return status_code, {
+        "lead_id": str(lead_id),
+        "result_id": str(result_id),
+        "status": response_dict["status"],
+        "analysis": response_dict["result_analysis"]
+    }
+
+@router.post("/diagnostics", response_model=DiagnosticResponse, status_code=status.HTTP_201_CREATED)
+async def submit_diagnostic(
+    diagnostic: DiagnosticCreate,
+    http_response: Response,
+    idempotency_key: Optional[str] = Header(None)
+):
+    """
+    POST /leads and POST /responses in one request: stores the lead (or
+    reuses the one with this email) and the answers, and starts the analysis.
+    Responds like POST /responses, plus the lead_id.
+    """
+    (status_code, result), replayed = await idempotency.run_idempotent(
+        "diagnostics", idempotency_key, diagnostic.model_dump(mode="json"), lambda: _submit(diagnostic)
+    )
+    http_response.status_code = status_code
+    if replayed:
+        http_response.headers["Idempotent-Replayed"] = "true"
+
+    if settings.FAST_JSON:
+        return fast_json(result, http_response)
+    return result
@@ -1,15 +1,71 @@
-from fastapi import APIRouter, HTTPException, status
-from app.models.lead import LeadCreate, LeadResponse
+from typing import Annotated, Optional, Tuple
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response, status
+from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from app.models.lead import LeadCreate, LeadResponse, BulkLeadsResponse
 from app.db.database import db
+from app.routers.auth import get_current_admin
+from app.services import idempotency, lead_import, stats_service
 from datetime import datetime
 
 router = APIRouter()
 
+async def _create_lead(lead: LeadCreate) -> Tuple[int, dict]:
+    lead_id = ObjectId()
+    created_at = datetime.utcnow()
+    email = lead.email
+    # Returning visitor: emails are unique, so their lead is reused and gets
+    # the details they just entered. The id is chosen here so the pre-image
+    # tells us whether we inserted.
+    details = {"$set": lead.model_dump(exclude={"email"})}
+    update = {**details, "$setOnInsert": {"_id": lead_id, "created_at": created_at}}
+    try:
+        existing = await db.leads.find_one_and_update(
+            {"email": email}, update,
+            upsert=True, projection={"_id": 1}, return_document=ReturnDocument.BEFORE
+        )
+    except DuplicateKeyError:
+        # A concurrent upsert of the same email won the race: update that lead
+        existing = await db.leads.find_one_and_update({"email": email}, details, projection={"_id": 1})
+        if existing is None:
+            raise
+
+    if existing is not None:
+        return status.HTTP_200_OK, {"id": str(existing["_id"])}
+    await stats_service.record_leads(created_at=created_at)
+    return status.HTTP_201_CREATED, {"id": str(lead_id)}
+
 @router.post("/leads", response_model=LeadResponse, status_code=status.HTTP_201_CREATED)
-async def create_lead(lead: LeadCreate):
-    lead_dict = lead.model_dump()
-    lead_dict["created_at"] = datetime.utcnow()
-    
-    new_lead = await db.leads.insert_one(lead_dict)
-    
-    return {"id": str(new_lead.inserted_id)}
\ No newline at end of file
+async def create_lead(
+    lead: LeadCreate,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None)
+):
+    (status_code, body), replayed = await idempotency.run_idempotent(
+        "leads", idempotency_key, lead.model_dump(mode="json"), lambda: _create_lead(lead)
+    )
+    response.status_code = status_code
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
+    return body
+
+@router.post("/leads/bulk", response_model=BulkLeadsResponse)
+async def bulk_create_leads(
+    request: Request,
+    current_admin: Annotated[dict, Depends(get_current_admin)]
+):
+    """
+    Imports leads from a JSON array, NDJSON or CSV body (by Content-Type).
+    The body is parsed as it streams in, so memory stays flat for any file size.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    try:
+        rows = lead_import.parse_rows(request.stream(), content_type)
+    except lead_import.UnsupportedFormat:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Send application/json, application/x-ndjson or text/csv"
+        )
+
+    return await lead_import.import_leads(rows)
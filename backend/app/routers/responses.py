@@ -1,69 +1,227 @@
-from fastapi import APIRouter, HTTPException, status, File, UploadFile, BackgroundTasks
+import json
+from typing import Optional, Tuple
+from fastapi import APIRouter, HTTPException, status, Header, Response
+from fastapi.responses import FileResponse, StreamingResponse
+from app.core.config import settings
+from app.core.responses import fast_json
 from app.models.response import ResponseCreate, AnalysisResponse
-from app.db.database import db
+from app.db.database import db, get_client
 from datetime import datetime
 from bson import ObjectId
-from app.services.ai_service import generate_analysis
-from app.services.email_service import send_report_email
+from app.services.ai_service import generate_analysis, stream_analysis
+from app.services.analysis_jobs import enqueue_analysis, notify_workers, STATUS_DONE, STATUS_FAILED, STATUS_PENDING
+from app.services import idempotency, report_service, result_cache, stats_service
+from app.services.email_outbox import enqueue_email
+from app.services.email_service import build_report_email
 
 router = APIRouter()
 
-@router.post("/responses", response_model=AnalysisResponse, status_code=status.HTTP_201_CREATED)
-async def submit_response(response: ResponseCreate):
-    # Verify lead exists
-    try:
-        if not ObjectId.is_valid(response.lead_id):
-             raise HTTPException(status_code=400, detail="Invalid lead_id format")
-             
-        lead = await db.leads.find_one({"_id": ObjectId(response.lead_id)})
-        if not lead:
-             raise HTTPException(status_code=404, detail="Lead not found")
-    except Exception as e:
-         # Handle other potential errors during DB lookup
-         if isinstance(e, HTTPException):
-             raise e
-         raise HTTPException(status_code=500, detail=str(e))
+async def _verify_lead(response: ResponseCreate):
+    if not ObjectId.is_valid(response.lead_id):
+        raise HTTPException(status_code=400, detail="Invalid lead_id format")
 
-    # Generate AI Analysis
-    analysis = await generate_analysis(response.answers)
+    # Database errors propagate to the app's handlers (a timeout is a 504)
+    lead = await db.leads.find_one({"_id": ObjectId(response.lead_id)}, {"_id": 1})
+    if not lead:
+        raise HTTPException(status_code=404, detail="Lead not found")
 
+async def _store_response(response: ResponseCreate, analysis: dict) -> str:
     response_dict = response.model_dump()
     response_dict["result_analysis"] = analysis
+    response_dict["status"] = STATUS_DONE
     response_dict["created_at"] = datetime.utcnow()
 
     new_response = await db.responses.insert_one(response_dict)
-    
-    return {
-        "result_id": str(new_response.inserted_id),
+    await stats_service.record_responses(created_at=response_dict["created_at"])
+    return str(new_response.inserted_id)
+
+async def _write_pending(response_dict: dict, session) -> ObjectId:
+    new_response = await db.responses.insert_one(response_dict, session=session)
+    await enqueue_analysis(new_response.inserted_id, session=session)
+    return new_response.inserted_id
+
+async def _store_pending(response_dict: dict) -> ObjectId:
+    """
+    Stores a pending response and its analysis job, in one transaction when
+    MONGODB_USE_TRANSACTIONS is on. Without it, a response left without a
+    job is picked up by the workers' orphan sweep.
+    """
+    if not settings.MONGODB_USE_TRANSACTIONS:
+        return await _write_pending(response_dict, None)
+
+    async with await get_client().start_session() as session:
+        # with_transaction may run the callback again; give it a fresh copy each time
+        return await session.with_transaction(lambda s: _write_pending(dict(response_dict), s))
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+async def _submit(response: ResponseCreate) -> Tuple[int, dict]:
+    # Verify lead exists
+    await _verify_lead(response)
+
+    if settings.ANALYSIS_MODE == "job":
+        # Store right away and let the background workers fill in the analysis
+        response_dict = response.model_dump()
+        response_dict["created_at"] = datetime.utcnow()
+        response_dict["result_analysis"] = None
+        response_dict["status"] = STATUS_PENDING
+        result_id = await _store_pending(response_dict)
+        await stats_service.record_responses(created_at=response_dict["created_at"])
+        # The job only became visible on commit
+        notify_workers()
+
+        return status.HTTP_202_ACCEPTED, {
+            "result_id": str(result_id),
+            "status": STATUS_PENDING,
+            "analysis": None
+        }
+
+    # Generate AI Analysis
+    analysis = await generate_analysis(response.answers)
+    result_id = await _store_response(response, analysis)
+    return status.HTTP_201_CREATED, {
+        "result_id": result_id,
+        "status": STATUS_DONE,
         "analysis": analysis
     }
 
+@router.post("/responses", response_model=AnalysisResponse, status_code=status.HTTP_201_CREATED)
+async def submit_response(
+    response: ResponseCreate,
+    http_response: Response,
+    idempotency_key: Optional[str] = Header(None)
+):
+    # A retried submission replays the first result instead of paying for
+    # (and storing) a second analysis
+    (status_code, result), replayed = await idempotency.run_idempotent(
+        "responses", idempotency_key, response.model_dump(mode="json"), lambda: _submit(response)
+    )
+    http_response.status_code = status_code
+    if replayed:
+        http_response.headers["Idempotent-Replayed"] = "true"
+
+    if settings.FAST_JSON:
+        return fast_json(result, http_response)
+    return result
+
+@router.post("/responses/stream")
+async def stream_response(response: ResponseCreate):
+    """
+    Same as POST /responses, but streams the analysis as Server-Sent Events:
+    one "section" event per finished section, then a "done" event carrying
+    the result_id once the assembled analysis has been stored.
+    """
+    await _verify_lead(response)
+
+    # Wait for the first section before starting the response, so an
+    # AdmissionRejected still becomes a plain 429 instead of a broken stream
+    sections = stream_analysis(response.answers)
+    first = await sections.__anext__()
+
+    async def all_sections():
+        yield first
+        async for section in sections:
+            yield section
+
+    async def events():
+        analysis = {}
+        async for key, value in all_sections():
+            analysis[key] = value
+            yield _sse("section", {"key": key, "value": value})
+
+        result_id = await _store_response(response, analysis)
+        yield _sse("done", {"result_id": result_id, "status": STATUS_DONE, "analysis": analysis})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        # Disable proxy buffering so each event reaches the browser immediately
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+def _cached_result_response(body: bytes, etag: str, if_none_match: Optional[str]) -> Response:
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={settings.RESULT_CACHE_MAX_AGE_SECONDS}, immutable",
+    }
+    if result_cache.etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
 @router.get("/results/{result_id}", response_model=AnalysisResponse)
-async def get_result(result_id: str):
+async def get_result(
+    result_id: str,
+    http_response: Response,
+    if_none_match: Optional[str] = Header(None)
+):
+    # Finished results are immutable: repeat reads are answered from memory
+    # (or with a 304) without touching the database
+    cached = result_cache.get_cached_result(result_id)
+    if cached is not None:
+        return _cached_result_response(*cached, if_none_match)
+
     if not ObjectId.is_valid(result_id):
         raise HTTPException(status_code=400, detail="Invalid result_id format")
         
-    response = await db.responses.find_one({"_id": ObjectId(result_id)})
+    response = await db.responses.find_one(
+        {"_id": ObjectId(result_id)}, {"status": 1, "result_analysis": 1}
+    )
     if not response:
         raise HTTPException(status_code=404, detail="Result not found")
     
-    return {
+    # Documents written before job mode existed carry no status
+    result = {
         "result_id": str(response["_id"]),
-        "analysis": response["result_analysis"]
+        "status": response.get("status", STATUS_DONE),
+        "analysis": response.get("result_analysis")
     }
+    if result["status"] == STATUS_DONE:
+        body, etag = result_cache.serialize_result(result)
+        result_cache.cache_result(result_id, body, etag)
+        return _cached_result_response(body, etag, if_none_match)
+
+    # Still pending (or failed): clients must come back to the server
+    http_response.headers["Cache-Control"] = "no-store"
+    if settings.FAST_JSON:
+        return fast_json(result, http_response)
+    return result
+
+@router.get("/results/{result_id}/report.pdf")
+async def download_report(result_id: str):
+    if not ObjectId.is_valid(result_id):
+        raise HTTPException(status_code=400, detail="Invalid result_id format")
+
+    # Rendered once per result and streamed from the cache afterwards
+    path = report_service.report_path(result_id)
+    if not path.exists():
+        response = await db.responses.find_one(
+            {"_id": ObjectId(result_id)}, {"result_analysis": 1, "status": 1}
+        )
+        if not response:
+            raise HTTPException(status_code=404, detail="Result not found")
+        if not response.get("result_analysis"):
+            raise HTTPException(status_code=409, detail="Analysis is not ready yet")
+        path = await report_service.ensure_report(result_id, response["result_analysis"])
+
+    return FileResponse(
+        path,
+        media_type="application/pdf",
+        filename="founder-clarity-report.pdf",
+    )
 
 @router.post("/results/{result_id}/email", status_code=status.HTTP_200_OK)
-async def email_result(
-    result_id: str,
-    background_tasks: BackgroundTasks,
-    file: UploadFile = File(...)
-):
+async def email_result(result_id: str):
+    # The report is rendered server-side. Older clients that still upload a
+    # PDF keep working: with no form parameter the body is never read.
     if not ObjectId.is_valid(result_id):
         raise HTTPException(status_code=400, detail="Invalid result_id format")
 
     response = await db.responses.find_one({"_id": ObjectId(result_id)})
     if not response:
         raise HTTPException(status_code=404, detail="Result not found")
+    if response.get("status") == STATUS_FAILED:
+        raise HTTPException(status_code=409, detail="Analysis failed for this result")
 
     lead_id = response.get("lead_id")
     if not lead_id:
@@ -78,10 +236,9 @@ async def email_result(
     if not email:
          raise HTTPException(status_code=400, detail="Lead has no email address")
 
-    # Read the file content
-    pdf_content = await file.read()
-    
-    # Send email in background
-    background_tasks.add_task(send_report_email, email, pdf_content, filename = f"founder-clarity-report-{name}.pdf")
+    # Persist in the outbox; the sender attaches the cached report and
+    # delivers it (with retries, also while a pending analysis finishes)
+    message = build_report_email(email, result_id, filename = f"founder-clarity-report-{name}.pdf")
+    await enqueue_email(message)
     
-    return {"message": "Email queued successfully"}
\ No newline at end of file
+    return {"message": "Email queued successfully"}
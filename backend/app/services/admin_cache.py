@@ -0,0 +1,35 @@
+import copy
+import time
+from typing import Optional
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+# Verified JWT -> admin document, so dashboard requests skip the admins lookup.
+_cache = TTLCache(
+    maxsize=settings.ADMIN_CACHE_MAX_ENTRIES,
+    ttl=settings.ADMIN_CACHE_TTL_SECONDS,
+)
+
+
+def get_cached_admin(token: str) -> Optional[dict]:
+    admin = _cache.get(token)
+    return copy.deepcopy(admin) if admin is not None else None
+
+
+def cache_admin(token: str, admin: dict, expires_at: Optional[float]):
+    """
+    Caches the admin for this token; the entry never outlives the token's exp.
+    Credentials are never cached, even if the caller's document holds them.
+    """
+    ttl = settings.ADMIN_CACHE_TTL_SECONDS
+    if expires_at is not None:
+        ttl = min(ttl, expires_at - time.time())
+    admin = {key: value for key, value in admin.items() if key != "hashed_password"}
+    _cache.set(token, copy.deepcopy(admin), ttl=ttl)
+
+
+def evict_admin(email: str) -> int:
+    """
+    Drops every cached token of this admin. Call whenever an admin document changes.
+    """
+    return _cache.purge(lambda token, admin: admin.get("email") == email)
@@ -1,94 +1,197 @@
+import copy
 import json
-import asyncio
-from openai import AsyncOpenAI
+import logging
+from typing import Any, AsyncIterator, List, Tuple
+from app.core.admission import AdmissionController, AdmissionRejected
+from app.core import deadline
 from app.core.config import settings
+from app.core.metrics import ANALYSIS_RESULTS
+from app.services import analysis_cache, prompt_engine
+from app.services.llm_router import llm_router
+from app.services.prompt_engine import ANALYSIS_SECTIONS
 
-# Initialize OpenRouter client
-client = AsyncOpenAI(
-    api_key=settings.OPENROUTER_API_KEY,
-    base_url="https://openrouter.ai/api/v1"
+logger = logging.getLogger(__name__)
+
+# Bounds concurrent LLM calls; cache hits never take a slot.
+# A full queue raises AdmissionRejected, which the API turns into a 429.
+llm_admission = AdmissionController(
+    "llm",
+    max_concurrent=settings.LLM_MAX_CONCURRENCY,
+    max_queue=settings.LLM_MAX_QUEUE,
+    max_wait=settings.LLM_QUEUE_TIMEOUT_SECONDS,
 )
 
+# Returned whenever the model cannot produce a usable analysis.
+# Never cached, so the next identical submission retries the model.
+FALLBACK_ANALYSIS = {
+    "mindset_shift": {
+        "title": "Strategic Alignment",
+        "description": "Focus on aligning your daily actions with your long-term vision to prevent burnout."
+    },
+    "operational_focus": {
+        "title": "Process Documentation",
+        "description": "Start documenting your core processes to reduce dependency on your direct involvement."
+    },
+    "next_move": {
+        "title": "Audit Your Time",
+        "description": "Spend the next 2 days tracking exactly where your time goes to identify low-leverage tasks."
+    }
+}
+
+
+async def generate_analysis(answers: dict, fallback: bool = True) -> dict:
+    """
+    Generates a 3-part strategic analysis through the LLM router.
+    Identical answers are served from the analysis cache without calling the model.
+    Raises AdmissionRejected when too many calls are already waiting for the model.
+    If the model fails, or the request's deadline passes first, the fallback
+    is returned right away; with fallback=False the error is raised instead,
+    for callers that retry (the analysis jobs).
+    """
+    cached = await analysis_cache.get_cached_analysis(answers)
+    if cached is not None:
+        ANALYSIS_RESULTS.inc(source="cache", mode="complete")
+        return cached
+
+    reserve = settings.LLM_DEADLINE_RESERVE_SECONDS
+    try:
+        async with llm_admission.slot(max_wait=deadline.budget(reserve)):
+            try:
+                analysis_data = await deadline.call(_request_analysis(answers), "llm", reserve)
+            except Exception as e:
+                logger.error(f"Error generating AI analysis: {e}")
+                if not fallback:
+                    raise
+                ANALYSIS_RESULTS.inc(source="fallback", mode="complete")
+                return copy.deepcopy(FALLBACK_ANALYSIS)
+    except AdmissionRejected as e:
+        # Still queued when the request's time ran out: degrade like any
+        # other late answer. A full queue stays a 429.
+        if e.reason != "deadline" or not fallback:
+            raise
+        logger.warning("Deadline passed while waiting for an LLM slot, using fallback analysis")
+        ANALYSIS_RESULTS.inc(source="fallback", mode="complete")
+        return copy.deepcopy(FALLBACK_ANALYSIS)
+
+    ANALYSIS_RESULTS.inc(source="llm", mode="complete")
+    await analysis_cache.store_analysis(answers, analysis_data)
+    return analysis_data
+
 
-async def generate_analysis(answers: dict) -> dict:
+async def _request_analysis(answers: dict) -> dict:
     """
-    Generates a 3-part strategic analysis using OpenRouter (DeepSeek free model).
-    Ensures valid JSON structure and cleans malformed output.
+    Asks the providers for the analysis and returns the first valid one.
+    Malformed output is repaired where possible; what cannot be repaired
+    counts as a failure, so the router fails over.
     """
+    return await llm_router.complete(
+        prompt_engine.build_messages(answers),
+        parse=prompt_engine.parse_completion,
+        on_usage=prompt_engine.record_usage,
+        response_format=prompt_engine.ANALYSIS_RESPONSE_FORMAT,
+    )
 
-    prompt = f"""
-    You are an expert business coach analyzing a founder's diagnostic answers.
-    
-    User responses (JSON):
-    {json.dumps(answers, indent=2)}
-    
-    Based on these answers, provide a 3-part analysis.
-    
-    Return ONLY this JSON structure:
-    {{
-      "mindset_shift": {{
-        "title": "The specific mindset shift they need (e.g. From 'Doing It All' to 'Delegating')",
-        "description": "2-3 sentences explaining why this shift is critical for them right now."
-      }},
-      "operational_focus": {{
-        "title": "The top operational area to fix (e.g. Hiring, Sales System, Onboarding)",
-        "description": "2-3 sentences on the specific bottleneck and the operational fix."
-      }},
-      "next_move": {{
-        "title": "The immediate next step",
-        "description": "One clear, actionable step they can take in the next 24-48 hours."
-      }}
-    }}
-    
-    Rules:
-    - No markdown.
-    - No code fences.
-    - Output must be valid JSON.
+
+class SectionStreamParser:
+    """
+    Incrementally scans streamed model output and returns each top-level
+    section of the analysis object as soon as its closing brace arrives.
+    Text before the first "{" (e.g. a code fence) is ignored.
     """
 
+    def __init__(self):
+        self.buffer = ""
+        self.pos = 0
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+        self.string_start = None
+        self.last_key = None
+        self.section_key = None
+        self.section_start = None
+
+    def feed(self, text: str) -> List[Tuple[str, Any]]:
+        self.buffer += text
+        completed = []
+
+        while self.pos < len(self.buffer):
+            char = self.buffer[self.pos]
+
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == "\\":
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+                    if self.depth == 1:
+                        # A string directly inside the root object: remember it as the key
+                        self.last_key = json.loads(self.buffer[self.string_start:self.pos + 1])
+            elif char == '"' and self.depth > 0:
+                self.in_string = True
+                self.string_start = self.pos
+            elif char in "{[":
+                self.depth += 1
+                if self.depth == 2:
+                    self.section_key = self.last_key
+                    self.section_start = self.pos
+            elif char in "}]" and self.depth > 0:
+                if self.depth == 2 and self.section_key is not None:
+                    raw = self.buffer[self.section_start:self.pos + 1]
+                    completed.append((self.section_key, json.loads(raw)))
+                    self.section_key = None
+                self.depth -= 1
+
+            self.pos += 1
+
+        return completed
+
+
+async def stream_analysis(answers: dict) -> AsyncIterator[Tuple[str, dict]]:
+    """
+    Yields (section, value) for all three sections, each as soon as it is
+    available: from the cache, from the streamed completion, or from the
+    fallback for sections the model failed to deliver.
+    """
+    cached = await analysis_cache.get_cached_analysis(answers)
+    if cached is not None:
+        ANALYSIS_RESULTS.inc(source="cache", mode="stream")
+        for key in ANALYSIS_SECTIONS:
+            yield key, cached[key]
+        return
+
+    analysis = {}
+    reserve = settings.LLM_DEADLINE_RESERVE_SECONDS
     try:
-        # Call OpenRouter using DeepSeek
-        response = await client.chat.completions.create(
-            model="tngtech/deepseek-r1t2-chimera:free",
-            messages=[{"role": "user", "content": prompt}]
-        )
-
-        raw = response.choices[0].message.content.strip()
-
-        # Clean up accidental formatting from DeepSeek
-        cleaned = (
-            raw.replace("```json", "")
-               .replace("```", "")
-               .strip()
-        )
-
-        analysis_data = json.loads(cleaned)
-
-        # Validate structure
-        required_keys = ["mindset_shift", "operational_focus, ", "next_move"]
-        for key in ["mindset_shift", "operational_focus", "next_move"]:
-            if key not in analysis_data:
-                raise ValueError(f"Missing section: {key}")
-            if "title" not in analysis_data[key] or "description" not in analysis_data[key]:
-                raise ValueError(f"Missing title/description in: {key}")
-
-        return analysis_data
-
-    except Exception as e:
-        print(f"Error generating AI analysis: {e}")
-
-        # Fallback that matches the required structure
-        return {
-            "mindset_shift": {
-                "title": "Strategic Alignment",
-                "description": "Focus on aligning your daily actions with your long-term vision to prevent burnout."
-            },
-            "operational_focus": {
-                "title": "Process Documentation",
-                "description": "Start documenting your core processes to reduce dependency on your direct involvement."
-            },
-            "next_move": {
-                "title": "Audit Your Time",
-                "description": "Spend the next 2 days tracking exactly where your time goes to identify low-leverage tasks."
-            }
-        }
+        async with llm_admission.slot(max_wait=deadline.budget(reserve)):
+            try:
+                parser = SectionStreamParser()
+                deltas = llm_router.stream(
+                    prompt_engine.build_messages(answers),
+                    on_usage=prompt_engine.record_usage,
+                    response_format=prompt_engine.ANALYSIS_RESPONSE_FORMAT,
+                )
+                # Sections still missing at the deadline come from the fallback
+                async for delta in deadline.iterate(deltas, "llm", reserve):
+                    for key, value in parser.feed(delta):
+                        if key in ANALYSIS_SECTIONS and key not in analysis:
+                            analysis[key] = prompt_engine.validate_section(key, value)
+                            yield key, analysis[key]
+            except Exception as e:
+                logger.error(f"Error streaming AI analysis: {e}")
+    except AdmissionRejected as e:
+        # Out of time while queued: every section comes from the fallback
+        if e.reason != "deadline":
+            raise
+        logger.warning("Deadline passed while waiting for an LLM slot, using fallback analysis")
+
+    if len(analysis) == len(ANALYSIS_SECTIONS):
+        ANALYSIS_RESULTS.inc(source="llm", mode="stream")
+        await analysis_cache.store_analysis(answers, analysis)
+        return
+
+    logger.warning(f"Streamed AI analysis incomplete, using fallback for {len(ANALYSIS_SECTIONS) - len(analysis)} section(s)")
+    ANALYSIS_RESULTS.inc(source="fallback", mode="stream")
+    for key in ANALYSIS_SECTIONS:
+        if key not in analysis:
+            yield key, copy.deepcopy(FALLBACK_ANALYSIS[key])
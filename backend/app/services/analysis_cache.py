@@ -0,0 +1,133 @@
+import copy
+import hashlib
+import json
+import logging
+from datetime import datetime
+from typing import Any, Optional
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.db.database import db
+
+logger = logging.getLogger(__name__)
+
+# First tier: per-process LRU. Second tier: the analysis_cache collection,
+# shared by every worker and kept across restarts.
+_memory = TTLCache(
+    maxsize=settings.ANALYSIS_CACHE_MAX_ENTRIES,
+    ttl=settings.ANALYSIS_CACHE_TTL_SECONDS,
+)
+
+_stats = {
+    "memory_hits": 0,
+    "mongo_hits": 0,
+    "misses": 0,
+    "stores": 0,
+}
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, str):
+        # Collapse whitespace so trivially different free-text answers share a key
+        return " ".join(value.split())
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    return value
+
+
+def answers_key(answers: dict, prompt_version: Optional[str] = None) -> str:
+    """
+    Canonical hash of the answers dict for the given prompt version.
+    """
+    canonical = json.dumps(
+        {
+            "prompt_version": prompt_version or settings.ANALYSIS_PROMPT_VERSION,
+            "answers": _normalize(answers),
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+async def get_cached_analysis(answers: dict) -> Optional[dict]:
+    if not settings.ANALYSIS_CACHE_ENABLED:
+        return None
+
+    key = answers_key(answers)
+    analysis = _memory.get(key)
+    if analysis is not None:
+        _stats["memory_hits"] += 1
+        return copy.deepcopy(analysis)
+
+    try:
+        doc = await db.analysis_cache.find_one({"_id": key}, {"analysis": 1})
+    except Exception as e:
+        logger.warning(f"Analysis cache lookup failed: {e}")
+        doc = None
+
+    if doc is None:
+        _stats["misses"] += 1
+        return None
+
+    _stats["mongo_hits"] += 1
+    _memory.set(key, doc["analysis"])
+    return copy.deepcopy(doc["analysis"])
+
+
+async def store_analysis(answers: dict, analysis: dict):
+    """
+    Stores a real LLM result. Callers must never pass the fallback analysis.
+    """
+    if not settings.ANALYSIS_CACHE_ENABLED:
+        return
+
+    key = answers_key(answers)
+    _memory.set(key, copy.deepcopy(analysis))
+    _stats["stores"] += 1
+
+    try:
+        await db.analysis_cache.replace_one(
+            {"_id": key},
+            {
+                "prompt_version": settings.ANALYSIS_PROMPT_VERSION,
+                "analysis": analysis,
+                "created_at": datetime.utcnow(),
+            },
+            upsert=True,
+        )
+    except Exception as e:
+        logger.warning(f"Analysis cache store failed: {e}")
+
+
+async def invalidate(all_versions: bool = False) -> int:
+    """
+    Drops cached analyses. By default only entries produced by other prompt
+    versions are removed from Mongo; the in-process tier is always cleared.
+    Returns the number of persisted entries deleted.
+    """
+    _memory.clear()
+    query = {} if all_versions else {"prompt_version": {"$ne": settings.ANALYSIS_PROMPT_VERSION}}
+    result = await db.analysis_cache.delete_many(query)
+    return result.deleted_count
+
+
+def cache_stats() -> dict:
+    lookups = _stats["memory_hits"] + _stats["mongo_hits"] + _stats["misses"]
+    hits = _stats["memory_hits"] + _stats["mongo_hits"]
+    return {
+        **_stats,
+        "memory_entries": len(_memory),
+        "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        "prompt_version": settings.ANALYSIS_PROMPT_VERSION,
+    }
+
+
+async def ensure_indexes():
+    # Expire persisted entries on their own
+    await db.analysis_cache.create_index(
+        "created_at", expireAfterSeconds=settings.ANALYSIS_CACHE_MONGO_TTL_SECONDS
+    )
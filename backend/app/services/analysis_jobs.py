@@ -0,0 +1,226 @@
+import asyncio
+import copy
+import logging
+from datetime import datetime, timedelta
+from typing import List, Optional, Set
+from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from app.core.config import settings
+from app.db.database import db
+from app.core.metrics import ANALYSIS_RESULTS
+from app.services.ai_service import FALLBACK_ANALYSIS, generate_analysis
+
+logger = logging.getLogger(__name__)
+
+STATUS_PENDING = "pending"
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+_workers: List[asyncio.Task] = []
+_sweeper: Optional[asyncio.Task] = None
+_wakeup: Optional[asyncio.Event] = None
+_in_flight: Set[ObjectId] = set()
+
+
+async def enqueue_analysis(response_id: ObjectId, session=None) -> ObjectId:
+    """
+    Queues the analysis of a stored response.
+    The job document is the durable record; waking the workers is only a hint.
+    """
+    result = await db.analysis_jobs.insert_one(_new_job(response_id), session=session)
+    notify_workers()
+    return result.inserted_id
+
+
+def _new_job(response_id: ObjectId) -> dict:
+    now = datetime.utcnow()
+    return {
+        "response_id": response_id,
+        "status": STATUS_PENDING,
+        "attempts": 0,
+        "run_after": now,
+        "locked_until": None,
+        "last_error": None,
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+async def requeue_orphans() -> int:
+    """
+    Queues a job for every pending response that has none, i.e. whose
+    submission stored the response but died before enqueueing its analysis.
+    Returns how many were queued.
+    """
+    # Recent responses may still be between their two writes
+    before = datetime.utcnow() - timedelta(seconds=settings.ANALYSIS_ORPHAN_GRACE_SECONDS)
+    queued = 0
+    async for response in db.responses.find({"status": STATUS_PENDING, "created_at": {"$lt": before}}, {"_id": 1}):
+        try:
+            # One job per response (unique index): a response that has one is left alone
+            result = await db.analysis_jobs.update_one(
+                {"response_id": response["_id"]}, {"$setOnInsert": _new_job(response["_id"])}, upsert=True
+            )
+        except DuplicateKeyError:
+            continue
+        if result.upserted_id is not None:
+            queued += 1
+    if queued:
+        logger.warning(f"Queued analysis jobs for {queued} orphaned pending response(s)")
+        notify_workers()
+    return queued
+
+
+async def _sweep_loop():
+    while True:
+        try:
+            await requeue_orphans()
+        except Exception as e:
+            logger.error(f"Could not requeue orphaned responses: {e}")
+        await asyncio.sleep(settings.ANALYSIS_ORPHAN_SWEEP_SECONDS)
+
+
+def notify_workers():
+    if _wakeup is not None:
+        _wakeup.set()
+
+
+async def _claim_job() -> Optional[dict]:
+    # Pending jobs that are due, plus running jobs whose lease expired
+    # (the worker holding them died, e.g. during a restart or deploy).
+    now = datetime.utcnow()
+    return await db.analysis_jobs.find_one_and_update(
+        {
+            "$or": [
+                {"status": STATUS_PENDING, "run_after": {"$lte": now}},
+                {"status": STATUS_RUNNING, "locked_until": {"$lt": now}},
+            ]
+        },
+        {
+            "$set": {
+                "status": STATUS_RUNNING,
+                "locked_until": now + timedelta(seconds=settings.ANALYSIS_JOB_LEASE_SECONDS),
+                "updated_at": now,
+            },
+            "$inc": {"attempts": 1},
+        },
+        sort=[("run_after", 1)],
+        return_document=ReturnDocument.AFTER,
+    )
+
+
+async def _run_job(job: dict):
+    response = await db.responses.find_one(
+        {"_id": job["response_id"]}, {"answers": 1}
+    )
+    if response is None:
+        raise LookupError(f"Response {job['response_id']} not found")
+
+    # Model failures raise, so they are retried by _fail_job
+    analysis = await generate_analysis(response.get("answers", {}), fallback=False)
+
+    now = datetime.utcnow()
+    await db.responses.update_one(
+        {"_id": job["response_id"]},
+        {"$set": {"result_analysis": analysis, "status": STATUS_DONE, "completed_at": now}},
+    )
+    await db.analysis_jobs.update_one(
+        {"_id": job["_id"]},
+        {"$set": {"status": STATUS_DONE, "locked_until": None, "updated_at": now}},
+    )
+
+
+async def _fail_job(job: dict, error: Exception):
+    now = datetime.utcnow()
+    if job["attempts"] >= settings.ANALYSIS_JOB_MAX_ATTEMPTS:
+        logger.error(f"Analysis job {job['_id']} failed permanently: {error}")
+        await db.analysis_jobs.update_one(
+            {"_id": job["_id"]},
+            {"$set": {"status": STATUS_FAILED, "locked_until": None, "last_error": str(error), "updated_at": now}},
+        )
+        # Out of retries: the user gets the generic analysis, as when the
+        # model fails during a synchronous request
+        ANALYSIS_RESULTS.inc(source="fallback", mode="complete")
+        await db.responses.update_one(
+            {"_id": job["response_id"], "status": STATUS_PENDING},
+            {"$set": {"result_analysis": copy.deepcopy(FALLBACK_ANALYSIS), "status": STATUS_DONE, "completed_at": now}},
+        )
+        return
+
+    # Exponential backoff between attempts
+    delay = 2 ** job["attempts"]
+    logger.warning(f"Analysis job {job['_id']} failed (attempt {job['attempts']}), retrying in {delay}s: {error}")
+    await db.analysis_jobs.update_one(
+        {"_id": job["_id"]},
+        {
+            "$set": {
+                "status": STATUS_PENDING,
+                "run_after": now + timedelta(seconds=delay),
+                "locked_until": None,
+                "last_error": str(error),
+                "updated_at": now,
+            }
+        },
+    )
+
+
+async def _worker_loop(worker_id: int):
+    while True:
+        try:
+            job = await _claim_job()
+        except Exception as e:
+            logger.error(f"Analysis worker {worker_id} could not claim a job: {e}")
+            job = None
+
+        if job is None:
+            try:
+                await asyncio.wait_for(_wakeup.wait(), timeout=settings.ANALYSIS_JOB_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            _wakeup.clear()
+            continue
+
+        _in_flight.add(job["_id"])
+        try:
+            await _run_job(job)
+        except Exception as e:
+            try:
+                await _fail_job(job, e)
+            except Exception as e:
+                logger.error(f"Analysis worker {worker_id} could not record failure: {e}")
+        # Not reached on cancellation, so stop_workers() can release the job.
+        _in_flight.discard(job["_id"])
+
+
+def start_workers():
+    global _wakeup, _sweeper
+    if _workers:
+        return
+    _wakeup = asyncio.Event()
+    for worker_id in range(settings.ANALYSIS_WORKERS):
+        _workers.append(asyncio.create_task(_worker_loop(worker_id)))
+    _sweeper = asyncio.create_task(_sweep_loop())
+    logger.info(f"Started {len(_workers)} analysis workers")
+
+
+async def stop_workers():
+    global _sweeper
+    if _sweeper is not None:
+        _sweeper.cancel()
+        await asyncio.gather(_sweeper, return_exceptions=True)
+        _sweeper = None
+    for task in _workers:
+        task.cancel()
+    await asyncio.gather(*_workers, return_exceptions=True)
+    _workers.clear()
+
+    # Hand interrupted jobs straight back to the queue instead of waiting
+    # for their lease to expire after the restart.
+    if _in_flight:
+        await db.analysis_jobs.update_many(
+            {"_id": {"$in": list(_in_flight)}, "status": STATUS_RUNNING},
+            {"$set": {"status": STATUS_PENDING, "locked_until": None}, "$inc": {"attempts": -1}},
+        )
+        _in_flight.clear()
@@ -0,0 +1,242 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from typing import List, Optional
+from bson import ObjectId
+from app.core.config import settings
+from app.core.metrics import EMAIL_SEND_DURATION, EMAIL_SENDS
+from app.db.database import db
+from app.services import report_service
+from app.services.email_service import EmailMessage, get_transport
+
+logger = logging.getLogger(__name__)
+
+STATUS_PENDING = "pending"
+STATUS_SENDING = "sending"
+STATUS_SENT = "sent"
+# Dead letters: gave up after EMAIL_MAX_ATTEMPTS, kept for inspection
+STATUS_DEAD = "dead"
+
+_sender: Optional[asyncio.Task] = None
+_wakeup: Optional[asyncio.Event] = None
+_latencies_ms: deque = deque(maxlen=500)
+_counters = {"sent": 0, "failed_attempts": 0, "dead": 0}
+
+
+async def enqueue_email(message: EmailMessage, session=None) -> ObjectId:
+    """
+    Persists the message in the outbox; the sender task delivers it.
+    """
+    now = datetime.utcnow()
+    doc = {
+        "to": message.to,
+        "subject": message.subject,
+        "html": message.html,
+        "attachments": [
+            {"filename": filename, "content": content}
+            for filename, content in message.attachments
+        ] + [
+            {"filename": filename, "result_id": result_id}
+            for filename, result_id in message.report_attachments
+        ],
+        "status": STATUS_PENDING,
+        "attempts": 0,
+        "next_attempt_at": now,
+        "locked_until": None,
+        "last_error": None,
+        "created_at": now,
+    }
+    result = await db.email_outbox.insert_one(doc, session=session)
+    if _wakeup is not None:
+        _wakeup.set()
+    return result.inserted_id
+
+
+def _due_filter(now: datetime) -> dict:
+    # Due pending messages, plus messages whose sender died mid-delivery
+    return {
+        "$or": [
+            {"status": STATUS_PENDING, "next_attempt_at": {"$lte": now}},
+            {"status": STATUS_SENDING, "locked_until": {"$lt": now}},
+        ]
+    }
+
+
+async def _claim_batch(limit: int) -> List[dict]:
+    now = datetime.utcnow()
+    due = await db.email_outbox.find(_due_filter(now), {"_id": 1}) \
+        .sort("next_attempt_at", 1).limit(limit).to_list(length=limit)
+    if not due:
+        return []
+
+    claim_id = ObjectId()
+    await db.email_outbox.update_many(
+        {"_id": {"$in": [doc["_id"] for doc in due]}, **_due_filter(now)},
+        {
+            "$set": {
+                "status": STATUS_SENDING,
+                "claim_id": claim_id,
+                "locked_until": now + timedelta(seconds=settings.EMAIL_LEASE_SECONDS),
+            },
+            "$inc": {"attempts": 1},
+        },
+    )
+    return await db.email_outbox.find({"claim_id": claim_id}).to_list(length=limit)
+
+
+async def _load_attachments(doc: dict) -> List[tuple]:
+    attachments = []
+    for attachment in doc.get("attachments", []):
+        if "result_id" in attachment:
+            # Raises ReportNotReady while the analysis is pending; retried later
+            content = await report_service.load_report(attachment["result_id"])
+        else:
+            content = bytes(attachment["content"])
+        attachments.append((attachment["filename"], content))
+    return attachments
+
+
+async def _deliver(doc: dict, slots: asyncio.Semaphore):
+    async with slots:
+        start = time.perf_counter()
+        try:
+            message = EmailMessage(
+                to=doc["to"],
+                subject=doc["subject"],
+                html=doc["html"],
+                attachments=await _load_attachments(doc),
+            )
+            provider_id = await get_transport().send(message)
+        except Exception as e:
+            await _retry_or_dead(doc, e)
+            return
+        elapsed = time.perf_counter() - start
+        _latencies_ms.append(elapsed * 1000)
+        EMAIL_SEND_DURATION.observe(elapsed)
+
+    _counters["sent"] += 1
+    EMAIL_SENDS.inc(outcome="sent")
+    await db.email_outbox.update_one(
+        {"_id": doc["_id"]},
+        {
+            # Attachments are only needed until delivery
+            "$set": {"status": STATUS_SENT, "sent_at": datetime.utcnow(), "provider_id": provider_id, "locked_until": None},
+            "$unset": {"attachments": ""},
+        },
+    )
+
+
+async def _retry_or_dead(doc: dict, error: Exception):
+    _counters["failed_attempts"] += 1
+    now = datetime.utcnow()
+
+    if doc["attempts"] >= settings.EMAIL_MAX_ATTEMPTS:
+        _counters["dead"] += 1
+        EMAIL_SENDS.inc(outcome="dead")
+        logger.error(f"Email {doc['_id']} to {doc['to']} dead-lettered after {doc['attempts']} attempts: {error}")
+        await db.email_outbox.update_one(
+            {"_id": doc["_id"]},
+            {"$set": {"status": STATUS_DEAD, "last_error": str(error), "locked_until": None}},
+        )
+        return
+
+    delay = min(
+        settings.EMAIL_RETRY_BASE_SECONDS * 2 ** (doc["attempts"] - 1),
+        settings.EMAIL_RETRY_MAX_SECONDS,
+    )
+    EMAIL_SENDS.inc(outcome="retry")
+    logger.warning(f"Email {doc['_id']} failed (attempt {doc['attempts']}), retrying in {delay}s: {error}")
+    await db.email_outbox.update_one(
+        {"_id": doc["_id"]},
+        {
+            "$set": {
+                "status": STATUS_PENDING,
+                "next_attempt_at": now + timedelta(seconds=delay),
+                "last_error": str(error),
+                "locked_until": None,
+            }
+        },
+    )
+
+
+async def _sender_loop():
+    slots = asyncio.Semaphore(settings.EMAIL_SEND_CONCURRENCY)
+    while True:
+        try:
+            batch = await _claim_batch(settings.EMAIL_BATCH_SIZE)
+        except Exception as e:
+            logger.error(f"Email sender could not claim messages: {e}")
+            batch = []
+
+        if not batch:
+            try:
+                await asyncio.wait_for(_wakeup.wait(), timeout=settings.EMAIL_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            _wakeup.clear()
+            continue
+
+        results = await asyncio.gather(*(_deliver(doc, slots) for doc in batch), return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error(f"Email sender failed to record a delivery: {result}")
+
+
+def start_sender():
+    global _sender, _wakeup
+    if _sender is not None:
+        return
+    _wakeup = asyncio.Event()
+    _sender = asyncio.create_task(_sender_loop())
+
+
+async def stop_sender():
+    global _sender
+    if _sender is None:
+        return
+    _sender.cancel()
+    await asyncio.gather(_sender, return_exceptions=True)
+    _sender = None
+
+
+def _percentile(values: List[float], pct: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))], 1)
+
+
+async def outbox_stats() -> dict:
+    """
+    Queue depth per status plus this process's delivery counters and
+    recent send latency.
+    """
+    depth = {
+        status: await db.email_outbox.count_documents({"status": status})
+        for status in (STATUS_PENDING, STATUS_SENDING, STATUS_DEAD)
+    }
+
+    oldest = await db.email_outbox.find_one(
+        {"status": STATUS_PENDING}, {"created_at": 1}, sort=[("created_at", 1)]
+    )
+    latencies = list(_latencies_ms)
+    return {
+        "queue": depth,
+        "oldest_pending_age_seconds": (
+            round((datetime.utcnow() - oldest["created_at"]).total_seconds(), 1) if oldest else None
+        ),
+        **_counters,
+        "send_latency_ms_p50": _percentile(latencies, 50),
+        "send_latency_ms_p95": _percentile(latencies, 95),
+    }
+
+
+async def ensure_indexes():
+    await db.email_outbox.create_index([("status", 1), ("next_attempt_at", 1)])
+    await db.email_outbox.create_index("claim_id", sparse=True)
+    # Delivered messages only carry sent_at, so only they expire
+    await db.email_outbox.create_index(
+        "sent_at", expireAfterSeconds=settings.EMAIL_SENT_RETENTION_SECONDS
+    )
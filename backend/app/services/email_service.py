@@ -1,24 +1,18 @@
+import asyncio
 import base64
 import logging
-import resend
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+from app.core import deadline
 from app.core.config import settings
+from app.core.metrics import DEPENDENCY_TIMEOUTS
 
 logger = logging.getLogger(__name__)
 
-# Configure Resend
-resend.api_key = settings.RESEND_API_KEY
+REPORT_EMAIL_SUBJECT = "Your Founder Clarity Compass Report"
 
-
-async def send_report_email(
-    email_to: str,
-    pdf_file: bytes,
-    filename: str = "founder-clarity-report.pdf",
-):
-    """
-    Sends the Founder Clarity Report PDF via Resend.
-    """
-
-    html = """
+REPORT_EMAIL_HTML = """
     <html>
       <body>
         <h2>Your Founder Clarity Report is Ready</h2>
@@ -39,23 +33,133 @@ async def send_report_email(
     </html>
     """
 
-    try:
-        response = resend.Emails.send({
+
+@dataclass
+class EmailMessage:
+    to: List[str]
+    subject: str
+    html: str
+    # (filename, content) pairs
+    attachments: List[Tuple[str, bytes]] = field(default_factory=list)
+    # (filename, result_id) pairs; the outbox attaches the cached report PDF
+    # at send time instead of storing its bytes
+    report_attachments: List[Tuple[str, str]] = field(default_factory=list)
+
+
+class EmailTransport(ABC):
+    """
+    Delivers a single message. Raises on failure so the outbox can retry.
+    """
+
+    @abstractmethod
+    async def send(self, message: EmailMessage) -> Optional[str]:
+        ...
+
+
+def _http_timeout(error: BaseException) -> bool:
+    # The SDK wraps the requests timeout in its own error
+    import requests
+
+    while error is not None:
+        if isinstance(error, requests.exceptions.Timeout):
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
+
+class ResendTransport(EmailTransport):
+    def __init__(self):
+        self._resend = None
+
+    def _sdk(self):
+        # Imported and configured on the first send, not when the app starts
+        if self._resend is None:
+            import resend
+            resend.api_key = settings.RESEND_API_KEY
+            resend.api_url = settings.RESEND_API_URL.rstrip("/")
+            # The SDK's HTTP timeout, so a hung send does not hold a thread
+            resend.default_http_client = resend.RequestsClient(timeout=settings.EMAIL_SEND_TIMEOUT_SECONDS)
+            self._resend = resend
+        return self._resend
+
+    async def send(self, message: EmailMessage) -> Optional[str]:
+        payload = {
             "from": settings.RESEND_FROM_EMAIL,
-            "to": [email_to],
-            "subject": "Your Founder Clarity Compass Report",
-            "html": html,
+            "to": message.to,
+            "subject": message.subject,
+            "html": message.html,
             "attachments": [
                 {
                     "filename": filename,
-                    "content": base64.b64encode(pdf_file).decode("utf-8"),
+                    "content": base64.b64encode(content).decode("utf-8"),
                 }
+                for filename, content in message.attachments
             ],
-        })
+        }
+        # The Resend SDK is blocking; keep it off the event loop
+        try:
+            response = await deadline.call(
+                asyncio.to_thread(self._sdk().Emails.send, payload),
+                "email",
+                # Slightly longer than the HTTP timeout, which normally fires first
+                cap=settings.EMAIL_SEND_TIMEOUT_SECONDS + 1,
+            )
+        except Exception as e:
+            if _http_timeout(e):
+                DEPENDENCY_TIMEOUTS.inc(dependency="email")
+            raise
+        return response.get("id") if isinstance(response, dict) else None
 
-        return response
 
-    except Exception as e:
-        logger.error(f"Resend email failed: {e}")
-        # Do NOT crash your API
-        return None
+class FakeTransport(EmailTransport):
+    """
+    Local stand-in for Resend: keeps sent messages in memory.
+    """
+
+    def __init__(self, latency: float = 0.0, fail: bool = False):
+        self.latency = latency
+        self.fail = fail
+        self.sent: List[EmailMessage] = []
+
+    async def send(self, message: EmailMessage) -> Optional[str]:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.fail:
+            raise RuntimeError("Fake transport failure")
+        self.sent.append(message)
+        logger.info(f"Fake email to {message.to}: {message.subject}")
+        return f"fake-{len(self.sent)}"
+
+
+_transport: Optional[EmailTransport] = None
+
+
+def get_transport() -> EmailTransport:
+    global _transport
+    if _transport is None:
+        _transport = FakeTransport() if settings.EMAIL_TRANSPORT == "fake" else ResendTransport()
+    return _transport
+
+
+def set_transport(transport: EmailTransport):
+    """
+    Replaces the transport, e.g. with a FakeTransport in tests.
+    """
+    global _transport
+    _transport = transport
+
+
+def build_report_email(
+    email_to: str,
+    result_id: str,
+    filename: str = "founder-clarity-report.pdf",
+) -> EmailMessage:
+    """
+    Builds the Founder Clarity Report email with the result's PDF attached.
+    """
+    return EmailMessage(
+        to=[email_to],
+        subject=REPORT_EMAIL_SUBJECT,
+        html=REPORT_EMAIL_HTML,
+        report_attachments=[(filename, result_id)],
+    )
@@ -0,0 +1,119 @@
+import csv
+import io
+import json
+import zlib
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Optional
+from app.core.config import settings
+from app.core.questions import QUESTION_IDS
+from app.db.database import admin_read_db
+from app.db.queries import lead_lookup_stages
+
+CSV_COLUMNS = ["id", "created_at", "name", "email", "company_size", "status"] + QUESTION_IDS + ["other_answers"]
+
+
+def _pipeline(start: Optional[datetime], end: Optional[datetime]) -> list:
+    created_at: Dict[str, Any] = {}
+    if start:
+        created_at["$gte"] = start
+    if end:
+        created_at["$lt"] = end
+
+    pipeline = []
+    if created_at:
+        pipeline.append({"$match": {"created_at": created_at}})
+    pipeline += [
+        {"$sort": {"created_at": 1, "_id": 1}},
+        {"$project": {"lead_id": 1, "answers": 1, "created_at": 1, "status": 1}},
+        *lead_lookup_stages(("name", "email", "company_size")),
+    ]
+    return pipeline
+
+
+async def _rows(start: Optional[datetime], end: Optional[datetime]) -> AsyncIterator[dict]:
+    # Server-side cursor: documents arrive EXPORT_BATCH_SIZE at a time
+    cursor = admin_read_db.responses.aggregate(
+        _pipeline(start, end), batchSize=settings.EXPORT_BATCH_SIZE, allowDiskUse=True
+    )
+    async for doc in cursor:
+        lead = doc.get("lead") or {}
+        yield {
+            "id": str(doc["_id"]),
+            "created_at": doc["created_at"].isoformat() if doc.get("created_at") else None,
+            "name": lead.get("name"),
+            "email": lead.get("email"),
+            "company_size": lead.get("company_size"),
+            # Documents written before job mode existed carry no status
+            "status": doc.get("status", "done"),
+            "answers": doc.get("answers") or {},
+        }
+
+
+def _csv_value(value: Any) -> Any:
+    if value is None or isinstance(value, str):
+        return value
+    return json.dumps(value, default=str)
+
+
+async def _csv_chunks(rows: AsyncIterator[dict]) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_COLUMNS)
+
+    count = 0
+    async for row in rows:
+        answers = row["answers"]
+        # One column per catalog question; anything else goes into other_answers
+        other = {key: value for key, value in answers.items() if key not in QUESTION_IDS}
+        writer.writerow(
+            [row[column] for column in CSV_COLUMNS[:6]]
+            + [_csv_value(answers.get(qid)) for qid in QUESTION_IDS]
+            + [json.dumps(other, default=str) if other else None]
+        )
+        count += 1
+        if count % settings.EXPORT_BATCH_SIZE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue()
+
+
+async def _ndjson_chunks(rows: AsyncIterator[dict]) -> AsyncIterator[str]:
+    lines = []
+    async for row in rows:
+        lines.append(json.dumps(row, default=str))
+        if len(lines) >= settings.EXPORT_BATCH_SIZE:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+async def _gzip(chunks: AsyncIterator[str]) -> AsyncIterator[bytes]:
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+    async for chunk in chunks:
+        data = compressor.compress(chunk.encode("utf-8"))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+async def _encode(chunks: AsyncIterator[str]) -> AsyncIterator[bytes]:
+    async for chunk in chunks:
+        yield chunk.encode("utf-8")
+
+
+def export_responses(
+    fmt: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    compress: bool = False,
+) -> AsyncIterator[bytes]:
+    """
+    Streams every response joined with its lead, oldest first, as CSV or
+    NDJSON (optionally gzipped). Memory use is bounded by EXPORT_BATCH_SIZE.
+    """
+    rows = _rows(start, end)
+    chunks = _csv_chunks(rows) if fmt == "csv" else _ndjson_chunks(rows)
+    return _gzip(chunks) if compress else _encode(chunks)
@@ -0,0 +1,183 @@
+import asyncio
+import hashlib
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from pymongo.errors import DuplicateKeyError
+from app.core import deadline
+from app.core.config import settings
+from app.db.database import db
+
+logger = logging.getLogger(__name__)
+
+STATUS_IN_PROGRESS = "in_progress"
+STATUS_COMPLETED = "completed"
+
+# (status_code, JSON body)
+StoredResponse = Tuple[int, Any]
+
+# Same-process duplicates are woken directly instead of waiting for the next poll
+_completions: Dict[str, asyncio.Event] = {}
+
+
+class IdempotencyError(Exception):
+    """
+    Base for requests that cannot be answered under their Idempotency-Key;
+    status_code is the HTTP status to reply with.
+    """
+
+    status_code = 400
+    retry_after: Optional[int] = None
+
+    def __init__(self, detail: str):
+        super().__init__(detail)
+        self.detail = detail
+
+
+class InvalidIdempotencyKey(IdempotencyError):
+    status_code = 400
+
+
+class IdempotencyKeyReused(IdempotencyError):
+    """
+    The key was already used for a request with a different body.
+    """
+
+    status_code = 422
+
+
+class IdempotencyInProgress(IdempotencyError):
+    """
+    The original request is still running after IDEMPOTENCY_WAIT_SECONDS.
+    """
+
+    status_code = 409
+    retry_after = 1
+
+
+def request_fingerprint(payload: Any) -> str:
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+async def _claim(record_id: str, fingerprint: str) -> Optional[dict]:
+    """
+    Inserts the in-progress marker. Returns None if this request now owns the
+    key, otherwise the existing record.
+    """
+    now = datetime.utcnow()
+    try:
+        await db.idempotency_keys.insert_one({
+            "_id": record_id,
+            "fingerprint": fingerprint,
+            "status": STATUS_IN_PROGRESS,
+            "locked_until": now + timedelta(seconds=settings.IDEMPOTENCY_LOCK_SECONDS),
+            "created_at": now,
+        })
+        return None
+    except DuplicateKeyError:
+        pass
+
+    # The owner may have died mid-request: take over an expired lock
+    taken = await db.idempotency_keys.find_one_and_update(
+        {"_id": record_id, "fingerprint": fingerprint, "status": STATUS_IN_PROGRESS, "locked_until": {"$lt": now}},
+        {"$set": {"locked_until": now + timedelta(seconds=settings.IDEMPOTENCY_LOCK_SECONDS)}},
+    )
+    if taken is not None:
+        logger.warning(f"Took over idempotency key {record_id} after its lock expired")
+        return None
+
+    record = await db.idempotency_keys.find_one({"_id": record_id})
+    if record is None:
+        # Released (failed) or expired between our insert and read: try again
+        return await _claim(record_id, fingerprint)
+    return record
+
+
+async def _wait_for_completion(record_id: str, fingerprint: str) -> Optional[StoredResponse]:
+    """
+    Waits for the in-flight original and returns its response; returns None
+    if this request ended up owning the key (the original failed or died).
+    """
+    # Never wait past the request's own deadline
+    wait = deadline.budget(cap=settings.IDEMPOTENCY_WAIT_SECONDS)
+    give_up_at = asyncio.get_running_loop().time() + wait
+    while True:
+        remaining = give_up_at - asyncio.get_running_loop().time()
+        if remaining <= 0:
+            raise IdempotencyInProgress("A request with this Idempotency-Key is still being processed")
+        event = _completions.setdefault(record_id, asyncio.Event())
+        try:
+            # Other processes finish the original too, so poll the record as well
+            await asyncio.wait_for(event.wait(), timeout=min(remaining, settings.IDEMPOTENCY_POLL_SECONDS))
+        except asyncio.TimeoutError:
+            pass
+
+        record = await _claim(record_id, fingerprint)
+        if record is None:
+            return None
+        if record["status"] == STATUS_COMPLETED:
+            return record["status_code"], record["body"]
+
+
+async def run_idempotent(
+    scope: str,
+    key: Optional[str],
+    payload: Any,
+    handler: Callable[[], Awaitable[StoredResponse]],
+) -> Tuple[StoredResponse, bool]:
+    """
+    Runs handler() at most once per (scope, key) within IDEMPOTENCY_TTL_SECONDS
+    and returns ((status_code, body), replayed). Without a key, handler() just runs.
+
+    A retry of a completed request replays the stored response. A concurrent
+    duplicate waits for the original to finish. If handler() raises, the key
+    is released so a retry runs the request again.
+    """
+    if key is None:
+        return await handler(), False
+    if not key or len(key) > settings.IDEMPOTENCY_MAX_KEY_LENGTH:
+        raise InvalidIdempotencyKey(
+            f"Idempotency-Key must be 1 to {settings.IDEMPOTENCY_MAX_KEY_LENGTH} characters"
+        )
+
+    record_id = f"{scope}:{key}"
+    fingerprint = request_fingerprint(payload)
+
+    record = await _claim(record_id, fingerprint)
+    if record is not None:
+        if record["fingerprint"] != fingerprint:
+            raise IdempotencyKeyReused("This Idempotency-Key was already used with a different request body")
+        if record["status"] == STATUS_COMPLETED:
+            return (record["status_code"], record["body"]), True
+        stored = await _wait_for_completion(record_id, fingerprint)
+        if stored is not None:
+            return stored, True
+
+    try:
+        status_code, body = await handler()
+    except BaseException:
+        await db.idempotency_keys.delete_one({"_id": record_id, "status": STATUS_IN_PROGRESS})
+        _wake(record_id)
+        raise
+
+    await db.idempotency_keys.update_one(
+        {"_id": record_id},
+        {"$set": {"status": STATUS_COMPLETED, "status_code": status_code, "body": body, "locked_until": None}},
+    )
+    _wake(record_id)
+    return (status_code, body), False
+
+
+def _wake(record_id: str):
+    event = _completions.pop(record_id, None)
+    if event is not None:
+        event.set()
+
+
+async def ensure_indexes():
+    # Keys (and their stored responses) expire on their own
+    await db.idempotency_keys.create_index(
+        "created_at", expireAfterSeconds=settings.IDEMPOTENCY_TTL_SECONDS
+    )
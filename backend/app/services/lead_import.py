@@ -0,0 +1,285 @@
+import codecs
+import csv
+import json
+from datetime import datetime
+from typing import AsyncIterator, List, Optional, Tuple, Union
+from pydantic import ValidationError
+from pymongo.errors import BulkWriteError
+from app.core.config import settings
+from app.db.database import db
+from app.models.lead import LeadCreate
+from app.services import stats_service
+
+JSON_TYPES = {"application/json"}
+NDJSON_TYPES = {"application/x-ndjson", "application/ndjson", "application/jsonl", "application/x-jsonlines"}
+CSV_TYPES = {"text/csv", "application/csv"}
+
+# A parsed row, or the reason it could not be parsed
+Row = Tuple[int, Union[dict, Exception]]
+
+
+class UnsupportedFormat(Exception):
+    pass
+
+
+async def _decode(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    async for chunk in chunks:
+        text = decoder.decode(chunk)
+        if text:
+            yield text
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+async def _lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    pending = ""
+    async for text in _decode(chunks):
+        pending += text
+        *complete, pending = pending.split("\n")
+        for line in complete:
+            yield line.rstrip("\r")
+    if pending:
+        yield pending.rstrip("\r")
+
+
+class JsonArrayScanner:
+    """
+    Splits a streamed JSON array of objects into its elements without
+    holding more than the current element in memory.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+        self.element_start: Optional[int] = None
+        # Inside a non-object element at the top level of the array
+        self.skipping = False
+
+    @property
+    def complete(self) -> bool:
+        # False if the body ended before the array was closed
+        return self.depth == 0 and self.element_start is None and not self.in_string
+
+    def feed(self, text: str) -> List[Union[dict, Exception]]:
+        elements = []
+        start = len(self.buffer)
+        self.buffer += text
+
+        for pos in range(start, len(self.buffer)):
+            char = self.buffer[pos]
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == "\\":
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+            elif self.depth == 0:
+                if char == "[":
+                    self.depth = 1
+                elif not char.isspace():
+                    raise ValueError("Body must be a JSON array")
+            elif self.depth == 1:
+                if char in "],":
+                    self.skipping = False
+                    if char == "]":
+                        self.depth = 0
+                elif char == "{":
+                    self.depth = 2
+                    self.element_start = pos
+                elif not char.isspace():
+                    if not self.skipping:
+                        elements.append(ValueError("Each array element must be an object"))
+                        self.skipping = True
+                    # A nested array is skipped whole: its commas and brackets
+                    # are counted below like those of an object
+                    self.in_string = char == '"'
+                    if char == "[":
+                        self.depth = 2
+            elif char == '"':
+                self.in_string = True
+            elif char in "{[":
+                self.depth += 1
+            elif char in "}]":
+                if self.depth == 2 and self.element_start is not None:
+                    raw = self.buffer[self.element_start:pos + 1]
+                    try:
+                        elements.append(json.loads(raw))
+                    except ValueError as e:
+                        elements.append(e)
+                    self.element_start = None
+                self.depth -= 1
+
+        # Drop everything before the element in progress
+        keep_from = self.element_start if self.element_start is not None else len(self.buffer)
+        self.buffer = self.buffer[keep_from:]
+        if self.element_start is not None:
+            self.element_start = 0
+        return elements
+
+
+async def _json_rows(chunks: AsyncIterator[bytes]) -> AsyncIterator[Row]:
+    scanner = JsonArrayScanner()
+    row = 0
+    async for text in _decode(chunks):
+        try:
+            elements = scanner.feed(text)
+        except ValueError as e:
+            yield row + 1, e
+            return
+        for element in elements:
+            row += 1
+            yield row, element
+    if not scanner.complete:
+        yield row + 1, ValueError("Unexpected end of JSON array")
+
+
+async def _ndjson_rows(chunks: AsyncIterator[bytes]) -> AsyncIterator[Row]:
+    row = 0
+    async for line in _lines(chunks):
+        if not line.strip():
+            continue
+        row += 1
+        try:
+            yield row, json.loads(line)
+        except ValueError as e:
+            yield row, e
+
+
+async def _csv_rows(chunks: AsyncIterator[bytes]) -> AsyncIterator[Row]:
+    header = None
+    record = ""
+    row = 0
+    async for line in _lines(chunks):
+        # A quoted field may span lines; wait until the quotes balance
+        record = f"{record}\n{line}" if record else line
+        if record.count('"') % 2:
+            continue
+        values, record = next(csv.reader([record]), []), ""
+        if not values:
+            continue
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        row += 1
+        if len(values) != len(header):
+            yield row, ValueError(f"Expected {len(header)} columns, got {len(values)}")
+        else:
+            yield row, dict(zip(header, values))
+
+
+def parse_rows(chunks: AsyncIterator[bytes], content_type: str) -> AsyncIterator[Row]:
+    if content_type in JSON_TYPES:
+        return _json_rows(chunks)
+    if content_type in NDJSON_TYPES:
+        return _ndjson_rows(chunks)
+    if content_type in CSV_TYPES:
+        return _csv_rows(chunks)
+    raise UnsupportedFormat(content_type)
+
+
+class ImportReport:
+    def __init__(self):
+        self.received = 0
+        self.inserted = 0
+        self.duplicates = 0
+        self.failed = 0
+        self.errors: List[dict] = []
+        self.errors_truncated = False
+
+    def error(self, row: int, message: str):
+        self.failed += 1
+        # Keep the report bounded however bad the file is
+        if len(self.errors) < settings.BULK_LEADS_MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row, "error": message})
+        else:
+            self.errors_truncated = True
+
+    def as_dict(self) -> dict:
+        return {
+            "received": self.received,
+            "inserted": self.inserted,
+            "duplicates": self.duplicates,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.errors_truncated,
+        }
+
+
+def _error_message(error: Exception) -> str:
+    if isinstance(error, ValidationError):
+        first = error.errors()[0]
+        field = ".".join(str(part) for part in first["loc"]) or "row"
+        return f"{field}: {first['msg']}"
+    return str(error)
+
+
+async def _flush(batch: List[Tuple[int, dict]], report: ImportReport):
+    # Emails already stored (by earlier batches too) count as duplicates
+    emails = [doc["email"] for _, doc in batch]
+    existing = {
+        doc["email"]
+        async for doc in db.leads.find({"email": {"$in": emails}}, {"email": 1, "_id": 0})
+    }
+
+    to_insert = []
+    for row, doc in batch:
+        if doc["email"] in existing:
+            report.duplicates += 1
+            continue
+        existing.add(doc["email"])
+        to_insert.append((row, doc))
+
+    if not to_insert:
+        return
+
+    try:
+        result = await db.leads.insert_many([doc for _, doc in to_insert], ordered=False)
+        inserted = len(result.inserted_ids)
+    except BulkWriteError as e:
+        inserted = e.details.get("nInserted", 0)
+        for write_error in e.details.get("writeErrors", []):
+            row = to_insert[write_error["index"]][0]
+            if write_error.get("code") == 11000:
+                report.duplicates += 1
+            else:
+                report.error(row, write_error.get("errmsg", "Write failed"))
+
+    report.inserted += inserted
+    if inserted:
+        await stats_service.record_leads(count=inserted)
+
+
+async def import_leads(rows: AsyncIterator[Row]) -> dict:
+    """
+    Validates streamed rows against LeadCreate and inserts them in unordered
+    batches. Bad rows are reported and skipped; they never abort the import.
+    """
+    report = ImportReport()
+    batch: List[Tuple[int, dict]] = []
+
+    async for row, data in rows:
+        report.received += 1
+        if isinstance(data, Exception):
+            report.error(row, _error_message(data))
+            continue
+        try:
+            lead = LeadCreate.model_validate(data)
+        except ValidationError as e:
+            report.error(row, _error_message(e))
+            continue
+
+        doc = lead.model_dump()
+        doc["created_at"] = datetime.utcnow()
+        batch.append((row, doc))
+        if len(batch) >= settings.BULK_LEADS_BATCH_SIZE:
+            await _flush(batch, report)
+            batch = []
+
+    if batch:
+        await _flush(batch, report)
+    return report.as_dict()
@@ -0,0 +1,238 @@
+import asyncio
+import contextvars
+import json
+import logging
+import time
+from collections import deque
+from datetime import datetime
+from typing import AsyncIterator, Deque, Optional, Set, Tuple
+from bson import ObjectId
+from pymongo.errors import OperationFailure, PyMongoError
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.metrics import LIVE_EVENTS, LIVE_SUBSCRIBERS
+from app.db.database import db
+
+logger = logging.getLogger(__name__)
+
+# Admin dashboards follow new leads and responses through one change stream
+# per process, fanned out to every connected admin, so database load does
+# not grow with the number of open dashboards. Each event carries its change
+# stream resume token as SSE id: a reconnect sends it back as Last-Event-ID
+# and is replayed what it missed from a buffer of recent events. A client
+# that is too far behind gets a "resync" event and reloads over REST.
+# The stream itself only resumes after errors; once no admin has been
+# connected for LIVE_IDLE_SECONDS it closes and the next one starts from now.
+
+_PIPELINE = [
+    {"$match": {
+        "ns.coll": {"$in": ["leads", "responses"]},
+        "$or": [
+            {"operationType": "insert"},
+            {"operationType": "update", "updateDescription.updatedFields.status": {"$exists": True}},
+        ],
+    }},
+    # The dashboard never shows analyses; keep them off the wire
+    {"$project": {"fullDocument.result_analysis": 0, "updateDescription.updatedFields.result_analysis": 0}},
+]
+
+# ChangeStreamHistoryLost: the resume token has fallen off the oplog
+_HISTORY_LOST = 286
+
+# (event id, SSE-formatted event)
+Event = Tuple[str, str]
+
+_subscribers: Set["_Subscriber"] = set()
+_buffer: Deque[Event] = deque(maxlen=settings.LIVE_BUFFER_SIZE)
+_resume_token: Optional[dict] = None
+_watcher: Optional[asyncio.Task] = None
+# Closes the change stream once no admin has been connected for LIVE_IDLE_SECONDS
+_idle_timer: Optional[asyncio.TimerHandle] = None
+# Names and emails of recent leads, so a response event usually needs no lookup
+_lead_names = TTLCache(maxsize=1024, ttl=3600)
+
+
+class _Subscriber:
+    def __init__(self):
+        self.queue: "asyncio.Queue[Event]" = asyncio.Queue(maxsize=settings.LIVE_CLIENT_QUEUE_SIZE)
+        # Set when the queue overflowed; the stream then ends with a resync
+        self.lagged = False
+
+
+def _json_default(value):
+    # Same format as the REST responses, so live rows and fetched rows match
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def _format(event: str, data: dict, event_id: Optional[str] = None) -> str:
+    head = f"id: {event_id}\n" if event_id else ""
+    return f"{head}event: {event}\ndata: {json.dumps(data, default=_json_default)}\n\n"
+
+
+async def _lead_summary(lead_id: str) -> dict:
+    summary = _lead_names.get(lead_id)
+    if summary is None:
+        lead = None
+        if ObjectId.is_valid(lead_id):
+            lead = await db.leads.find_one({"_id": ObjectId(lead_id)}, {"name": 1, "email": 1})
+        summary = {"name": (lead or {}).get("name", "Unknown"), "email": (lead or {}).get("email", "Unknown")}
+        _lead_names.set(lead_id, summary)
+    return summary
+
+
+async def _to_event(change: dict) -> Optional[Tuple[str, dict]]:
+    collection = change["ns"]["coll"]
+    doc_id = str(change["documentKey"]["_id"])
+    if change["operationType"] == "insert":
+        doc = change["fullDocument"]
+        if collection == "leads":
+            summary = {"name": doc.get("name"), "email": doc.get("email")}
+            _lead_names.set(doc_id, summary)
+            return "lead.created", {
+                "id": doc_id, **summary, "company_size": doc.get("company_size"), "created_at": doc.get("created_at"),
+            }
+        # Same shape as an item of GET /admin/responses
+        return "response.created", {
+            "id": doc_id,
+            **(await _lead_summary(str(doc.get("lead_id")))),
+            "answers": doc.get("answers") or {},
+            "created_at": doc.get("created_at"),
+            "status": doc.get("status"),
+        }
+    if collection == "responses":
+        return "response.updated", {"id": doc_id, "status": change["updateDescription"]["updatedFields"]["status"]}
+    return None
+
+
+def _broadcast(event: Event):
+    for subscriber in _subscribers:
+        if subscriber.lagged:
+            continue
+        try:
+            subscriber.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            subscriber.lagged = True
+
+
+async def _watch_loop():
+    global _resume_token
+    while True:
+        try:
+            async with db.watch(_PIPELINE, resume_after=_resume_token) as stream:
+                async for change in stream:
+                    converted = await _to_event(change)
+                    if converted is not None:
+                        event_id = change["_id"]["_data"]
+                        event = (event_id, _format(*converted, event_id=event_id))
+                        _buffer.append(event)
+                        LIVE_EVENTS.inc(event=converted[0])
+                        _broadcast(event)
+                    # Only now: a watcher cancelled (or failing) inside _to_event
+                    # must resume before this change, not after it
+                    _resume_token = change["_id"]
+        except asyncio.CancelledError:
+            raise
+        except PyMongoError as e:
+            # Change streams need a replica set; a standalone mongod ends up here too
+            logger.error(f"Live feed change stream failed: {e}")
+            if isinstance(e, OperationFailure) and e.code == _HISTORY_LOST:
+                # Events were missed for good: start over and make clients reload
+                _resume_token = None
+                _buffer.clear()
+                for subscriber in _subscribers:
+                    subscriber.lagged = True
+            await asyncio.sleep(settings.LIVE_RETRY_SECONDS)
+
+
+def _subscribe() -> _Subscriber:
+    global _watcher, _idle_timer
+    subscriber = _Subscriber()
+    _subscribers.add(subscriber)
+    LIVE_SUBSCRIBERS.set(len(_subscribers))
+    if _idle_timer is not None:
+        _idle_timer.cancel()
+        _idle_timer = None
+    if _watcher is None:
+        # A fresh context: the watcher must not inherit this request's deadline
+        _watcher = asyncio.create_task(_watch_loop(), context=contextvars.Context())
+    return subscriber
+
+
+def _unsubscribe(subscriber: _Subscriber):
+    global _idle_timer
+    _subscribers.discard(subscriber)
+    LIVE_SUBSCRIBERS.set(len(_subscribers))
+    if not _subscribers and _watcher is not None and _idle_timer is None:
+        # Kept open for a while, so a dashboard that is just reconnecting
+        # still gets its missed events replayed from the buffer
+        _idle_timer = asyncio.get_running_loop().call_later(settings.LIVE_IDLE_SECONDS, _stop_watcher)
+
+
+def _stop_watcher():
+    global _watcher, _idle_timer, _resume_token
+    _idle_timer = None
+    if _subscribers or _watcher is None:
+        return
+    # Nobody is watching: close the change stream and forget its position.
+    # The next watcher starts from now; a new dashboard loads what happened
+    # meanwhile over REST, so resuming here would deliver it twice.
+    _watcher.cancel()
+    _watcher = None
+    _resume_token = None
+    _buffer.clear()
+
+
+def _missed_since(last_event_id: str) -> Optional[list]:
+    """
+    Buffered events after last_event_id, or None if it is no longer buffered.
+    """
+    events = list(_buffer)
+    for index, (event_id, _) in enumerate(events):
+        if event_id == last_event_id:
+            return events[index + 1:]
+    return None
+
+
+async def stream(last_event_id: Optional[str] = None) -> AsyncIterator[str]:
+    """
+    Server-Sent Events for one admin connection: a "ready" event, any missed
+    events (when reconnecting with Last-Event-ID), then live events.
+    Comments keep idle connections open; the stream ends after
+    LIVE_MAX_CONNECTION_SECONDS so clients reconnect and re-authenticate.
+    """
+    subscriber = _subscribe()
+    # Taken together with subscribing (no await in between), so every later
+    # event reaches this client through its queue exactly once
+    missed = _missed_since(last_event_id) if last_event_id else []
+    try:
+        # Tells EventSource-style clients how long to wait before reconnecting
+        yield f"retry: {int(settings.LIVE_RETRY_SECONDS * 1000)}\n\n"
+        if last_event_id:
+            if missed is None:
+                yield _format("resync", {"reason": "missed events are no longer available"})
+            else:
+                for _, event in missed:
+                    yield event
+        yield _format("ready", {"resumed": bool(last_event_id)})
+
+        ends_at = time.monotonic() + settings.LIVE_MAX_CONNECTION_SECONDS
+        while True:
+            if subscriber.lagged:
+                yield _format("resync", {"reason": "client fell behind"})
+                return
+            remaining = ends_at - time.monotonic()
+            if remaining <= 0:
+                return
+            try:
+                _, event = await asyncio.wait_for(
+                    subscriber.queue.get(), timeout=min(remaining, settings.LIVE_HEARTBEAT_SECONDS)
+                )
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            yield event
+    finally:
+        _unsubscribe(subscriber)
+
@@ -0,0 +1,391 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, Dict, List, Optional
+from app.core.config import settings
+from app.core.metrics import LLM_REQUEST_DURATION, LLM_TOKENS
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
+logger = logging.getLogger(__name__)
+
+
+class LLMUnavailable(Exception):
+    """
+    Raised when every provider failed or is skipped by its circuit breaker.
+    """
+
+
+@dataclass
+class ProviderConfig:
+    name: str
+    base_url: str
+    api_key: str
+    models: List[str]
+    # Accepts response_format={"type": "json_schema", ...}
+    structured_output: bool = False
+
+
+@dataclass
+class Target:
+    provider: str
+    model: str
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures; after `reset_seconds`
+    a single trial request is let through (half-open) to probe recovery.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trial_in_flight = False
+
+    def available(self) -> bool:
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN:
+            return time.monotonic() - self.opened_at >= self.reset_seconds
+        return not self.trial_in_flight
+
+    def acquire(self) -> bool:
+        """
+        Claims a request right before it is sent. While half-open only the
+        first claim succeeds (that request is the trial, see is_trial()),
+        however many callers saw the circuit as available.
+        """
+        if not self.available():
+            return False
+        if self.state == self.OPEN:
+            self.state = self.HALF_OPEN
+        if self.state == self.HALF_OPEN:
+            self.trial_in_flight = True
+        return True
+
+    def is_trial(self) -> bool:
+        # Right after a successful acquire(): whether that request is the trial
+        return self.state == self.HALF_OPEN
+
+    def on_cancel(self, trial: bool):
+        if trial:
+            self.trial_in_flight = False
+
+    def on_success(self):
+        self.state = self.CLOSED
+        self.failures = 0
+        self.trial_in_flight = False
+
+    def on_failure(self, trial: bool):
+        self.failures += 1
+        if trial:
+            self.trial_in_flight = False
+        if trial or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                logger.warning(f"Circuit opened after {self.failures} failures")
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+
+@dataclass
+class ProviderStats:
+    latencies: deque = field(default_factory=lambda: deque(maxlen=200))
+    # Rolling window of recent outcomes (True = success)
+    outcomes: deque = field(default_factory=lambda: deque(maxlen=100))
+    successes: int = 0
+    failures: int = 0
+
+    def record(self, ok: bool, latency: Optional[float] = None):
+        self.outcomes.append(ok)
+        if ok:
+            self.successes += 1
+            if latency is not None:
+                self.latencies.append(latency)
+        else:
+            self.failures += 1
+
+    def record_abandoned(self, elapsed: float):
+        # A request cancelled after `elapsed` (e.g. it lost a hedge race) would
+        # have taken at least that long. Leaving it out would bias p95, and so
+        # the hedge delay, toward the fast requests that got to finish.
+        self.latencies.append(elapsed)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))]
+
+    def success_rate(self) -> Optional[float]:
+        if not self.outcomes:
+            return None
+        return sum(self.outcomes) / len(self.outcomes)
+
+
+class LLMRouter:
+    """
+    Routes chat completions over an ordered list of providers and models.
+
+    - Providers with an open circuit breaker are skipped instead of timed out on.
+    - Providers whose recent success rate is poor are tried after healthy ones.
+    - If the first request is slower than the provider's p95 latency, a hedged
+      request goes to the next target; whichever succeeds first wins.
+    - A failed request fails over to the next target immediately.
+    """
+
+    def __init__(self, providers: List[ProviderConfig]):
+        self.providers = {p.name: p for p in providers}
+        self.targets = [Target(p.name, model) for p in providers for model in p.models]
+        self.breakers = {
+            p.name: CircuitBreaker(settings.LLM_BREAKER_FAILURE_THRESHOLD, settings.LLM_BREAKER_RESET_SECONDS)
+            for p in providers
+        }
+        self.stats = {p.name: ProviderStats() for p in providers}
+        self._clients: Dict[str, "AsyncOpenAI"] = {}
+
+    @classmethod
+    def from_settings(cls) -> "LLMRouter":
+        known = {
+            "openrouter": ProviderConfig(
+                "openrouter", settings.OPENROUTER_BASE_URL, settings.OPENROUTER_API_KEY, settings.OPENROUTER_MODELS,
+                structured_output=settings.OPENROUTER_STRUCTURED_OUTPUT,
+            ),
+            "gemini": ProviderConfig(
+                "gemini", settings.GEMINI_BASE_URL, settings.GEMINI_API_KEY, settings.GEMINI_MODELS,
+                structured_output=settings.GEMINI_STRUCTURED_OUTPUT,
+            ),
+        }
+        return cls([known[name] for name in settings.LLM_PROVIDERS if name in known and known[name].models])
+
+    def _client(self, provider: str) -> "AsyncOpenAI":
+        if provider not in self._clients:
+            # The SDK takes most of a second to import: wait for the first call
+            from openai import AsyncOpenAI
+
+            config = self.providers[provider]
+            # Retries are the router's job (failover to the next target)
+            self._clients[provider] = AsyncOpenAI(
+                api_key=config.api_key,
+                base_url=config.base_url,
+                max_retries=0,
+                timeout=settings.LLM_REQUEST_TIMEOUT_SECONDS,
+            )
+        return self._clients[provider]
+
+    def _candidates(self) -> List[Target]:
+        def unhealthy(target: Target) -> bool:
+            stats = self.stats[target.provider]
+            rate = stats.success_rate()
+            return len(stats.outcomes) >= settings.LLM_HEDGE_MIN_SAMPLES and rate < settings.LLM_MIN_SUCCESS_RATE
+
+        available = [t for t in self.targets if self.breakers[t.provider].available()]
+        # Stable sort keeps the configured order within each group
+        return sorted(available, key=unhealthy)
+
+    def _hedge_delay(self, target: Target) -> float:
+        stats = self.stats[target.provider]
+        if len(stats.latencies) < settings.LLM_HEDGE_MIN_SAMPLES:
+            return settings.LLM_HEDGE_DEFAULT_SECONDS
+        return min(max(stats.percentile(95), settings.LLM_HEDGE_MIN_SECONDS), settings.LLM_HEDGE_MAX_SECONDS)
+
+    def _request_kwargs(self, target: Target, kwargs: dict) -> dict:
+        # response_format is a preference: providers without structured
+        # output get the plain request and rely on the prompt instead
+        if "response_format" in kwargs and not self.providers[target.provider].structured_output:
+            return {k: v for k, v in kwargs.items() if k != "response_format"}
+        return kwargs
+
+    async def _call(self, target: Target, trial: bool, messages: list, parse: Callable[[Any], Any], kwargs: dict,
+                    on_usage: Optional[Callable[[Any], None]]):
+        # The caller has acquired the breaker; trial says whether this is the half-open probe
+        breaker = self.breakers[target.provider]
+        start = time.perf_counter()
+        try:
+            response = await self._client(target.provider).chat.completions.create(
+                model=target.model, messages=messages, **self._request_kwargs(target, kwargs)
+            )
+            result = parse(response)
+        except asyncio.CancelledError:
+            # Lost a hedge race; says nothing about the provider's health
+            breaker.on_cancel(trial)
+            self.stats[target.provider].record_abandoned(self._observe(target, "cancelled", start))
+            raise
+        except Exception:
+            breaker.on_failure(trial)
+            self.stats[target.provider].record(False)
+            self._observe(target, "error", start)
+            raise
+        breaker.on_success()
+        self.stats[target.provider].record(True, self._observe(target, "ok", start))
+        self._record_usage(target, getattr(response, "usage", None), on_usage)
+        return result
+
+    def _observe(self, target: Target, outcome: str, start: float) -> float:
+        elapsed = time.perf_counter() - start
+        LLM_REQUEST_DURATION.observe(elapsed, provider=target.provider, model=target.model, outcome=outcome)
+        return elapsed
+
+    def _record_usage(self, target: Target, usage, on_usage: Optional[Callable[[Any], None]] = None):
+        if usage is None:
+            return
+        for kind in ("prompt", "completion"):
+            tokens = getattr(usage, f"{kind}_tokens", None)
+            if tokens:
+                LLM_TOKENS.inc(tokens, provider=target.provider, model=target.model, kind=kind)
+        if on_usage is not None:
+            on_usage(usage)
+
+    async def complete(
+        self,
+        messages: list,
+        parse: Callable[[Any], Any] = lambda r: r,
+        on_usage: Optional[Callable[[Any], None]] = None,
+        **kwargs
+    ) -> Any:
+        """
+        Returns parse(response) from the first target that succeeds.
+        parse() raising counts as a failure of that target. on_usage gets the
+        token usage of each successful call.
+        """
+        candidates = self._candidates()
+        in_flight: Dict[asyncio.Task, Target] = {}
+        errors: List[str] = []
+        hedged = not settings.LLM_HEDGE_ENABLED
+
+        def launch() -> Optional[Target]:
+            # The breaker is claimed here rather than in _candidates(), so a
+            # half-open provider gets one trial however many calls race, and
+            # its other targets are skipped while that trial is in flight
+            while candidates:
+                target = candidates.pop(0)
+                breaker = self.breakers[target.provider]
+                if not breaker.acquire():
+                    continue
+                task = asyncio.create_task(
+                    self._call(target, breaker.is_trial(), messages, parse, kwargs, on_usage)
+                )
+                in_flight[task] = target
+                return target
+            return None
+
+        if launch() is None:
+            raise LLMUnavailable("All LLM providers are unavailable (circuits open)")
+        try:
+            while in_flight:
+                timeout = None
+                if not hedged and candidates:
+                    timeout = self._hedge_delay(next(iter(in_flight.values())))
+
+                done, _ = await asyncio.wait(in_flight, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    hedged = True
+                    target = launch()
+                    if target is not None:
+                        logger.info(f"Hedging LLM request to {target.provider}/{target.model}")
+                    continue
+
+                for task in done:
+                    target = in_flight.pop(task)
+                    try:
+                        return task.result()
+                    except Exception as e:
+                        errors.append(f"{target.provider}/{target.model}: {e}")
+
+                # Everything that finished failed: fail over right away
+                if not in_flight:
+                    launch()
+        finally:
+            for task in in_flight:
+                task.cancel()
+
+        raise LLMUnavailable("; ".join(errors))
+
+    async def stream(
+        self, messages: list, on_usage: Optional[Callable[[Any], None]] = None, **kwargs
+    ) -> AsyncIterator[str]:
+        """
+        Yields content deltas from the first target that accepts the stream.
+        Fails over only before the first delta; no hedging for streams.
+        """
+        errors = []
+        for target in self._candidates():
+            breaker = self.breakers[target.provider]
+            if not breaker.acquire():
+                # Its provider's half-open trial is already in flight
+                continue
+            trial = breaker.is_trial()
+            start = time.perf_counter()
+            try:
+                stream = await self._client(target.provider).chat.completions.create(
+                    model=target.model, messages=messages, stream=True,
+                    # Usage arrives in a final chunk with no choices
+                    stream_options={"include_usage": True},
+                    **self._request_kwargs(target, kwargs)
+                )
+            except Exception as e:
+                breaker.on_failure(trial)
+                self.stats[target.provider].record(False)
+                self._observe(target, "error", start)
+                errors.append(f"{target.provider}/{target.model}: {e}")
+                continue
+
+            finished = False
+            usage = None
+            try:
+                async for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+                    if getattr(chunk, "usage", None) is not None:
+                        usage = chunk.usage
+                finished = True
+            except Exception:
+                breaker.on_failure(trial)
+                self.stats[target.provider].record(False)
+                self._observe(target, "error", start)
+                raise
+            finally:
+                if not finished:
+                    # Consumer went away (or we failed): release a half-open
+                    # trial and the HTTP connection instead of leaving both to GC
+                    breaker.on_cancel(trial)
+                    try:
+                        await stream.close()
+                    except Exception as e:
+                        logger.warning(f"Could not close LLM stream from {target.provider}: {e}")
+            breaker.on_success()
+            self.stats[target.provider].record(True, self._observe(target, "ok", start))
+            self._record_usage(target, usage, on_usage)
+            return
+
+        raise LLMUnavailable("; ".join(errors) or "All LLM providers are unavailable (circuits open)")
+
+    def snapshot(self) -> List[dict]:
+        result = []
+        for name, stats in self.stats.items():
+            p50, p95 = stats.percentile(50), stats.percentile(95)
+            rate = stats.success_rate()
+            result.append({
+                "provider": name,
+                "models": self.providers[name].models,
+                "circuit": self.breakers[name].state,
+                "successes": stats.successes,
+                "failures": stats.failures,
+                "success_rate": round(rate, 3) if rate is not None else None,
+                "latency_p50_seconds": round(p50, 3) if p50 is not None else None,
+                "latency_p95_seconds": round(p95, 3) if p95 is not None else None,
+            })
+        return result
+
+
+llm_router = LLMRouter.from_settings()
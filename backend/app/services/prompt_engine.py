@@ -0,0 +1,253 @@
+import json
+import re
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from app.core.config import settings
+from app.core.metrics import ANALYSIS_PARSES, LLM_CALL_TOKENS
+from app.core.questions import QUESTIONS
+
+ANALYSIS_SECTIONS = ["mindset_shift", "operational_focus", "next_move"]
+
+_QUESTIONS_BY_ID = {question.id: question for question in QUESTIONS}
+
+
+@dataclass(frozen=True)
+class PromptTemplate:
+    version: str
+    # Empty for templates that put everything in the user message
+    system: str
+    # Formatted with {answers}, the output of encode_answers
+    user: str
+    encode_answers: Callable[[dict], str]
+
+
+def _encode_json(answers: dict) -> str:
+    return json.dumps(answers, indent=2)
+
+
+def _encode_compact(answers: dict) -> str:
+    """
+    One "label: answer" line per answered question, in catalog order, with
+    whitespace collapsed and long answers clipped. Keys the catalog does not
+    know are kept under their own id.
+    """
+    lines = []
+    known = [question.id for question in QUESTIONS if question.id in answers]
+    others = sorted(key for key in answers if key not in _QUESTIONS_BY_ID)
+    for key in known + others:
+        value = answers[key]
+        text = value if isinstance(value, str) else json.dumps(value, separators=(",", ":"))
+        text = " ".join(text.split())
+        if not text:
+            continue
+        if len(text) > settings.ANALYSIS_MAX_ANSWER_CHARS:
+            text = text[:settings.ANALYSIS_MAX_ANSWER_CHARS].rstrip() + "…"
+        question = _QUESTIONS_BY_ID.get(key)
+        lines.append(f"{question.label if question else key}: {text}")
+    return "\n".join(lines)
+
+
+TEMPLATES: Dict[str, PromptTemplate] = {
+    # The original prompt, kept so results can be compared and rolled back
+    "v1": PromptTemplate(
+        version="v1",
+        system="",
+        user="""
+    You are an expert business coach analyzing a founder's diagnostic answers.
+
+    User responses (JSON):
+    {answers}
+
+    Based on these answers, provide a 3-part analysis.
+
+    Return ONLY this JSON structure:
+    {{
+      "mindset_shift": {{
+        "title": "The specific mindset shift they need (e.g. From 'Doing It All' to 'Delegating')",
+        "description": "2-3 sentences explaining why this shift is critical for them right now."
+      }},
+      "operational_focus": {{
+        "title": "The top operational area to fix (e.g. Hiring, Sales System, Onboarding)",
+        "description": "2-3 sentences on the specific bottleneck and the operational fix."
+      }},
+      "next_move": {{
+        "title": "The immediate next step",
+        "description": "One clear, actionable step they can take in the next 24-48 hours."
+      }}
+    }}
+
+    Rules:
+    - No markdown.
+    - No code fences.
+    - Output must be valid JSON.
+    """,
+        encode_answers=_encode_json,
+    ),
+    # Same instructions, stated once in a fixed system message (which
+    # providers can cache), with the answers as compact labelled lines
+    "v2": PromptTemplate(
+        version="v2",
+        system=(
+            "You are an expert business coach. From a founder's diagnostic answers, write a 3-part analysis.\n"
+            "Reply with JSON only (no markdown), each section an object with \"title\" and \"description\":\n"
+            "mindset_shift: the mindset shift they need (e.g. From 'Doing It All' to 'Delegating'); "
+            "description: 2-3 sentences on why it is critical right now.\n"
+            "operational_focus: the top operational area to fix (e.g. Hiring, Sales System, Onboarding); "
+            "description: 2-3 sentences on the bottleneck and the fix.\n"
+            "next_move: the immediate next step; description: one clear action for the next 24-48 hours."
+        ),
+        user="Founder's answers:\n{answers}",
+        encode_answers=_encode_compact,
+    ),
+}
+
+# Passed as response_format to providers that support structured output
+ANALYSIS_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "founder_analysis",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                key: {
+                    "type": "object",
+                    "properties": {"title": {"type": "string"}, "description": {"type": "string"}},
+                    "required": ["title", "description"],
+                    "additionalProperties": False,
+                }
+                for key in ANALYSIS_SECTIONS
+            },
+            "required": ANALYSIS_SECTIONS,
+            "additionalProperties": False,
+        },
+    },
+}
+
+
+def get_template(version: Optional[str] = None) -> PromptTemplate:
+    version = version or settings.ANALYSIS_PROMPT_VERSION
+    if version not in TEMPLATES:
+        raise ValueError(f"Unknown prompt version: {version}")
+    return TEMPLATES[version]
+
+
+def build_messages(answers: dict, version: Optional[str] = None) -> List[dict]:
+    template = get_template(version)
+    messages = []
+    if template.system:
+        messages.append({"role": "system", "content": template.system})
+    messages.append({"role": "user", "content": template.user.format(answers=template.encode_answers(answers))})
+    return messages
+
+
+def validate_section(key: str, value) -> dict:
+    if not isinstance(value, dict) or "title" not in value or "description" not in value:
+        raise ValueError(f"Missing title/description in: {key}")
+    return {"title": str(value["title"]).strip(), "description": str(value["description"]).strip()}
+
+
+_THINK_BLOCK = re.compile(r"<think>.*?</think>", re.DOTALL)
+_TRAILING_COMMA = re.compile(r",\s*([}\]])")
+
+
+def _close_truncated(text: str) -> str:
+    """
+    Closes the strings, objects and arrays left open by a cut-off completion.
+    """
+    stack = []
+    in_string = escaped = False
+    for char in text:
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in "{[":
+            stack.append("}" if char == "{" else "]")
+        elif char in "}]" and stack:
+            stack.pop()
+    if in_string:
+        text += '"'
+    return text + "".join(reversed(stack))
+
+
+def _repair(raw: str) -> Any:
+    # Reasoning models may prepend their thinking; others wrap JSON in fences
+    text = _THINK_BLOCK.sub("", raw)
+    text = text.replace("```json", "").replace("```", "").strip()
+    start = text.find("{")
+    if start == -1:
+        raise ValueError("No JSON object in model output")
+    text = text[start:]
+    end = text.rfind("}")
+    candidates = [text[:end + 1]] if end != -1 else []
+    candidates.append(_close_truncated(text))
+
+    last_error = None
+    for candidate in candidates:
+        try:
+            return json.loads(_TRAILING_COMMA.sub(r"\1", candidate))
+        except json.JSONDecodeError as e:
+            last_error = e
+    raise ValueError(f"Unrepairable model output: {last_error}")
+
+
+def parse_analysis(raw: str) -> Tuple[dict, bool]:
+    """
+    Returns (analysis, repaired). Well-formed output is parsed as-is; fences,
+    reasoning preambles, trailing commas, truncation and an extra wrapping
+    object are repaired. Raises ValueError if no complete analysis can be
+    recovered.
+    """
+    repaired = False
+    try:
+        data = json.loads(raw)
+    except json.JSONDecodeError:
+        data = _repair(raw)
+        repaired = True
+
+    if isinstance(data, dict) and not any(key in data for key in ANALYSIS_SECTIONS):
+        # e.g. {"analysis": {...}}
+        nested = [value for value in data.values() if isinstance(value, dict)]
+        if len(nested) == 1:
+            data = nested[0]
+            repaired = True
+    if not isinstance(data, dict):
+        raise ValueError("Model output is not a JSON object")
+
+    analysis = {}
+    for key in ANALYSIS_SECTIONS:
+        if key not in data:
+            raise ValueError(f"Missing section: {key}")
+        analysis[key] = validate_section(key, data[key])
+    return analysis, repaired
+
+
+def parse_completion(response) -> dict:
+    """
+    router.complete() parse callback: raises on unusable output so the
+    router fails over to the next target.
+    """
+    try:
+        analysis, repaired = parse_analysis(response.choices[0].message.content or "")
+    except ValueError:
+        ANALYSIS_PARSES.inc(outcome="failed")
+        raise
+    ANALYSIS_PARSES.inc(outcome="repaired" if repaired else "clean")
+    return analysis
+
+
+def record_usage(usage, version: Optional[str] = None):
+    """
+    router on_usage callback: per-call token counts by template version.
+    """
+    version = version or settings.ANALYSIS_PROMPT_VERSION
+    for kind in ("prompt", "completion"):
+        tokens = getattr(usage, f"{kind}_tokens", None)
+        if tokens:
+            LLM_CALL_TOKENS.observe(tokens, prompt_version=version, kind=kind)
@@ -0,0 +1,130 @@
+import asyncio
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict
+from bson import ObjectId
+from app.core.config import settings
+from app.db.database import db
+
+# Mirrors the layout of generatePDF() in frontend/src/pages/ResultsPage.tsx
+REPORT_SECTIONS = [
+    ("mindset_shift", "TOP MINDSET SHIFT", (37, 99, 235)),
+    ("operational_focus", "OPERATIONAL FOCUS", (22, 163, 74)),
+    ("next_move", "YOUR NEXT MOVE", (217, 119, 6)),
+]
+
+# The core PDF fonts are Latin-1 only; map the punctuation models like to use
+_PUNCTUATION = str.maketrans({
+    "\u2018": "'", "\u2019": "'", "\u201c": '"', "\u201d": '"',
+    "\u2013": "-", "\u2014": "-", "\u2026": "...", "\u00a0": " ",
+})
+
+_render_locks: Dict[str, asyncio.Lock] = {}
+
+
+class ReportNotReady(Exception):
+    pass
+
+
+def _pdf_text(value) -> str:
+    text = str(value or "N/A").translate(_PUNCTUATION)
+    return text.encode("latin-1", "replace").decode("latin-1")
+
+
+def render_report_pdf(analysis: dict) -> bytes:
+    """
+    Renders the Founder Clarity report for a stored result_analysis.
+    """
+    # fpdf is only needed here; keep it out of the import path of the app
+    from fpdf import FPDF
+
+    pdf = FPDF(format="A4")
+    pdf.set_auto_page_break(auto=True, margin=20)
+    pdf.add_page()
+
+    pdf.set_font("Helvetica", "B", 22)
+    pdf.set_text_color(41, 128, 185)
+    pdf.cell(0, 12, "Founder Clarity Report", align="C", new_x="LMARGIN", new_y="NEXT")
+
+    pdf.set_font("Helvetica", "", 12)
+    pdf.set_text_color(100, 100, 100)
+    pdf.cell(0, 8, "Personalized Insights to help you move forward", align="C", new_x="LMARGIN", new_y="NEXT")
+    pdf.ln(12)
+
+    for key, header, color in REPORT_SECTIONS:
+        section = analysis.get(key) or {}
+
+        pdf.set_font("Helvetica", "B", 10)
+        pdf.set_text_color(*color)
+        pdf.cell(0, 6, header, new_x="LMARGIN", new_y="NEXT")
+
+        pdf.set_font("Helvetica", "B", 16)
+        pdf.set_text_color(33, 33, 33)
+        pdf.multi_cell(0, 8, _pdf_text(section.get("title")), new_x="LMARGIN", new_y="NEXT")
+        pdf.ln(2)
+
+        pdf.set_font("Helvetica", "", 12)
+        pdf.set_text_color(60, 60, 60)
+        pdf.multi_cell(0, 7, _pdf_text(section.get("description")), new_x="LMARGIN", new_y="NEXT")
+        pdf.ln(10)
+
+    pdf.set_y(-25)
+    pdf.set_font("Helvetica", "", 10)
+    pdf.set_text_color(150, 150, 150)
+    pdf.cell(0, 6, "Disclaimer: These insights are directional and intended for reflection.", align="C")
+
+    return bytes(pdf.output())
+
+
+def report_path(result_id: str) -> Path:
+    return Path(settings.REPORT_CACHE_DIR) / f"{result_id}.pdf"
+
+
+def _write_atomic(path: Path, data: bytes):
+    # Write to a temp file and rename so readers never see a partial PDF
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+async def ensure_report(result_id: str, analysis: dict) -> Path:
+    """
+    Returns the cached PDF for a result, rendering it on first use.
+    Results never change once done, so the file never needs invalidating.
+    """
+    path = report_path(result_id)
+    if path.exists():
+        return path
+
+    lock = _render_locks.setdefault(result_id, asyncio.Lock())
+    try:
+        async with lock:
+            if not path.exists():
+                data = await asyncio.to_thread(render_report_pdf, analysis)
+                await asyncio.to_thread(_write_atomic, path, data)
+    finally:
+        if not lock.locked():
+            _render_locks.pop(result_id, None)
+    return path
+
+
+async def load_report(result_id: str) -> bytes:
+    """
+    Reads the report for a result, rendering it from the database if needed.
+    """
+    path = report_path(result_id)
+    if not path.exists():
+        response = await db.responses.find_one(
+            {"_id": ObjectId(result_id)}, {"result_analysis": 1, "status": 1}
+        )
+        if not response or not response.get("result_analysis"):
+            raise ReportNotReady(f"No analysis stored for result {result_id}")
+        path = await ensure_report(result_id, response["result_analysis"])
+    return await asyncio.to_thread(path.read_bytes)
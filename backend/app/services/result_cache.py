@@ -0,0 +1,49 @@
+import hashlib
+from typing import Optional, Tuple
+import orjson
+from app.core.cache import SizedLRUCache
+from app.core.config import settings
+from app.core.metrics import RESULT_CACHE_LOOKUPS
+
+# Serialized GET /results/{id} bodies for finished results, which never change.
+# Keyed by result_id; pending results are never stored.
+_cache = SizedLRUCache(max_bytes=settings.RESULT_CACHE_MAX_BYTES)
+
+
+def serialize_result(result: dict) -> Tuple[bytes, str]:
+    """
+    Returns the response body and its strong ETag (a hash of the body).
+    """
+    body = orjson.dumps(result, default=str)
+    return body, f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def get_cached_result(result_id: str) -> Optional[Tuple[bytes, str]]:
+    entry = _cache.get(result_id)
+    RESULT_CACHE_LOOKUPS.inc(outcome="hit" if entry is not None else "miss")
+    return entry
+
+
+def cache_result(result_id: str, body: bytes, etag: str):
+    _cache.set(result_id, body, etag)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Weak comparison, as If-None-Match requires: W/ prefixes are ignored
+    (the compression middleware weakens ETags of compressed bodies).
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+def cache_stats() -> dict:
+    return {
+        "entries": len(_cache),
+        "bytes": _cache.current_bytes,
+        "max_bytes": _cache.max_bytes,
+    }
@@ -0,0 +1,125 @@
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional
+from pymongo import ReplaceOne, UpdateOne
+from app.db.database import admin_read_db, db
+
+logger = logging.getLogger(__name__)
+
+# All counters live in the dashboard_stats collection:
+#   {"_id": "totals", "leads": n, "responses": n, "reconciled_at": <last rebuild>}
+#   {"_id": "daily:2026-01-31", "leads": n, "responses": n}
+#   {"_id": "monthly:2026-01", "leads": n, "responses": n}
+TOTALS_ID = "totals"
+
+
+def _daily_id(ts: datetime) -> str:
+    return f"daily:{ts:%Y-%m-%d}"
+
+
+def _monthly_id(ts: datetime) -> str:
+    return f"monthly:{ts:%Y-%m}"
+
+
+async def _increment(field: str, count: int, created_at: Optional[datetime], session=None):
+    ts = created_at or datetime.utcnow()
+    ops = [
+        UpdateOne({"_id": doc_id}, {"$inc": {field: count}}, upsert=True)
+        for doc_id in (TOTALS_ID, _daily_id(ts), _monthly_id(ts))
+    ]
+    try:
+        await db.dashboard_stats.bulk_write(ops, ordered=False, session=session)
+    except Exception as e:
+        # The write that is being counted already succeeded; drift is repaired
+        # by reconcile_stats().
+        logger.error(f"Failed to update dashboard stats ({field} += {count}): {e}")
+
+
+async def record_leads(count: int = 1, created_at: Optional[datetime] = None, session=None):
+    await _increment("leads", count, created_at, session=session)
+
+
+async def record_responses(count: int = 1, created_at: Optional[datetime] = None, session=None):
+    await _increment("responses", count, created_at, session=session)
+
+
+def _last_months(now: datetime, months: int) -> List[str]:
+    keys = []
+    year, month = now.year, now.month
+    for _ in range(months):
+        keys.append(f"{year:04d}-{month:02d}")
+        month -= 1
+        if month == 0:
+            year, month = year - 1, 12
+    return list(reversed(keys))
+
+
+async def get_dashboard_stats(months: int = 12) -> dict:
+    """
+    Reads the totals and the last `months` monthly buckets in one query.
+    """
+    month_keys = _last_months(datetime.utcnow(), months)
+    ids = [TOTALS_ID] + [f"monthly:{key}" for key in month_keys]
+    docs = {doc["_id"]: doc async for doc in admin_read_db.dashboard_stats.find({"_id": {"$in": ids}})}
+
+    totals = docs.get(TOTALS_ID, {})
+    return {
+        "total_leads": totals.get("leads", 0),
+        "total_responses": totals.get("responses", 0),
+        "monthly_completions": [
+            {"month": key, "completions": docs.get(f"monthly:{key}", {}).get("responses", 0)}
+            for key in month_keys
+        ],
+    }
+
+
+async def _daily_counts(collection) -> Dict[str, int]:
+    pipeline = [
+        {"$match": {"created_at": {"$type": "date"}}},
+        {"$group": {
+            "_id": {"$dateToString": {"format": "%Y-%m-%d", "date": "$created_at"}},
+            "count": {"$sum": 1},
+        }},
+    ]
+    return {doc["_id"]: doc["count"] async for doc in collection.aggregate(pipeline)}
+
+
+async def reconcile_stats() -> dict:
+    """
+    Rebuilds every counter from the raw leads and responses collections.
+    Increments that land while this runs may be overwritten; run it again
+    (or during a quiet period) if exact figures matter.
+    """
+    counts: Dict[str, Dict[str, int]] = {}
+
+    def add(doc_id: str, field: str, value: int):
+        counts.setdefault(doc_id, {"leads": 0, "responses": 0})[field] += value
+
+    for field, collection in (("leads", db.leads), ("responses", db.responses)):
+        add(TOTALS_ID, field, await collection.count_documents({}))
+        for day, count in (await _daily_counts(collection)).items():
+            add(f"daily:{day}", field, count)
+            add(f"monthly:{day[:7]}", field, count)
+
+    # Marks the counters as built; see ensure_stats()
+    counts[TOTALS_ID]["reconciled_at"] = datetime.utcnow()
+    ops = [ReplaceOne({"_id": doc_id}, fields, upsert=True) for doc_id, fields in counts.items()]
+    await db.dashboard_stats.bulk_write(ops, ordered=False)
+    await db.dashboard_stats.delete_many({"_id": {"$nin": list(counts)}})
+
+    return counts[TOTALS_ID]
+
+
+async def ensure_stats() -> bool:
+    """
+    Builds the counters if they never were: on a new deployment, or the first
+    start after upgrading from counting on every read. Increments alone may
+    already have created the totals, so only a past reconcile_stats() counts.
+    Returns whether the counters were rebuilt.
+    """
+    totals = await db.dashboard_stats.find_one({"_id": TOTALS_ID}, {"reconciled_at": 1})
+    if totals is not None and "reconciled_at" in totals:
+        return False
+    logger.info("Dashboard stats were never built; rebuilding them from leads and responses")
+    await reconcile_stats()
+    return True
@@ -0,0 +1,94 @@
+import argparse
+import asyncio
+import time
+from app.core.config import settings
+from app.db import database
+
+# Benchmark: throughput of a concurrent read/write mix at different pool sizes.
+# Each pool size gets a fresh client built from the app's settings, so
+# compressors and timeouts match production; only maxPoolSize changes.
+# Works in its own scratch database, which is dropped at the end.
+#
+# Usage (from backend/, with a local mongod running):
+#   python bench_mongo_pool.py --pool-sizes 5,10,25,50,100 --concurrency 200
+
+BENCH_DATABASE = "pool_bench"
+SEED_DOCS = 1000
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def seed(collection):
+    await collection.drop()
+    await collection.insert_many([
+        {"_id": i, "answers": {f"q{n}": "x" * 40 for n in range(1, 13)}}
+        for i in range(SEED_DOCS)
+    ])
+
+
+async def worker(collection, n, operations, latencies, write_ratio):
+    # Deterministic mix: every 1/write_ratio-th operation is an insert
+    every = round(1 / write_ratio) if write_ratio else 0
+    for i in range(operations):
+        start = time.perf_counter()
+        if every and i % every == 0:
+            await collection.insert_one({"worker": n, "i": i, "answers": {"q1": "x" * 40}})
+        else:
+            await collection.find_one({"_id": (n * operations + i) % SEED_DOCS})
+        latencies.append((time.perf_counter() - start) * 1000)
+
+
+async def run(pool_size, concurrency, operations, write_ratio):
+    client = database.connect(maxPoolSize=pool_size)
+    try:
+        collection = client[BENCH_DATABASE].docs
+        # Warm the pool so connection setup is not measured
+        await asyncio.gather(*(collection.find_one({"_id": 0}) for _ in range(pool_size)))
+
+        latencies = []
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            worker(collection, n, operations, latencies, write_ratio)
+            for n in range(concurrency)
+        ))
+        elapsed = time.perf_counter() - start
+    finally:
+        database.close()
+
+    print(
+        f"pool={pool_size:<4} ops={len(latencies)} "
+        f"throughput={len(latencies) / elapsed:,.0f} ops/s "
+        f"p50={percentile(latencies, 50):.1f}ms p99={percentile(latencies, 99):.1f}ms"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="mongodb://localhost:27017")
+    parser.add_argument("--pool-sizes", default="5,10,25,50,100")
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--operations", type=int, default=50, help="per concurrent worker")
+    parser.add_argument("--write-ratio", type=float, default=0.1)
+    args = parser.parse_args()
+
+    settings.MONGODB_URL = args.url
+    client = database.connect()
+    await seed(client[BENCH_DATABASE].docs)
+    database.close()
+
+    print(f"compressors={','.join(settings.MONGODB_COMPRESSORS) or 'none'} concurrency={args.concurrency}")
+    try:
+        for pool_size in (int(size) for size in args.pool_sizes.split(",")):
+            await run(pool_size, args.concurrency, args.operations, args.write_ratio)
+    finally:
+        client = database.connect()
+        await client.drop_database(BENCH_DATABASE)
+        database.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
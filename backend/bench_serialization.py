@@ -0,0 +1,110 @@
+import argparse
+import gzip
+import json
+import time
+from datetime import datetime
+from typing import List
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from app.core.compression import brotli
+from app.core.questions import QUESTIONS
+from app.core.responses import FastJSONResponse
+from app.models.response import AnalysisResponse
+from app.routers.admin import AdminResponseItem, StatsResponse
+
+# Micro-benchmark: CPU cost of turning an endpoint's return value into bytes.
+#   standard: response_model validation, then jsonable_encoder and json.dumps
+#             (what FastAPI does for a returned dict)
+#   fast:     orjson straight from the dict (FAST_JSON=true)
+# Also prints the size and cost of gzip/brotli for each payload.
+#
+# Usage (from backend/): python bench_serialization.py --page-size 200 --answer-chars 400
+
+
+def admin_page(page_size: int, answer_chars: int) -> list:
+    return [
+        {
+            "id": str(ObjectId()),
+            "name": f"Founder {i}",
+            "email": f"founder{i}@example.com",
+            "answers": {question.id: ("x" * answer_chars if not question.options else question.options[0])
+                        for question in QUESTIONS},
+            "created_at": datetime.utcnow(),
+        }
+        for i in range(page_size)
+    ]
+
+
+def stats_payload() -> dict:
+    return {
+        "total_leads": 12345,
+        "total_responses": 6789,
+        "completion_rate": 54.99,
+        "monthly_completions": [{"month": f"2025-{m:02d}", "completions": m * 40} for m in range(1, 13)],
+    }
+
+
+def result_payload() -> dict:
+    return {
+        "result_id": str(ObjectId()),
+        "status": "done",
+        "analysis": {
+            key: {"title": "A title of moderate length", "description": "Two or three sentences. " * 4}
+            for key in ("mindset_shift", "operational_focus", "next_move")
+        },
+    }
+
+
+def standard(adapter: TypeAdapter, payload) -> bytes:
+    validated = adapter.validate_python(payload)
+    content = jsonable_encoder(adapter.dump_python(validated, mode="json"))
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def fast(payload) -> bytes:
+    return FastJSONResponse(payload).body
+
+
+def timed(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--page-size", type=int, default=200)
+    parser.add_argument("--answer-chars", type=int, default=400)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    endpoints = [
+        ("GET /admin/responses", TypeAdapter(List[AdminResponseItem]), admin_page(args.page_size, args.answer_chars)),
+        ("GET /admin/stats", TypeAdapter(StatsResponse), stats_payload()),
+        ("GET /results/{id}", TypeAdapter(AnalysisResponse), result_payload()),
+    ]
+
+    print(f"{'endpoint':<22} {'standard':>12} {'fast':>12} {'speedup':>8} {'bytes':>9} "
+          f"{'gzip':>16} {'brotli':>16}")
+    for name, adapter, payload in endpoints:
+        standard_us = timed(lambda: standard(adapter, payload), args.repeat)
+        fast_us = timed(lambda: fast(payload), args.repeat)
+        body = fast(payload)
+
+        gzip_us = timed(lambda: gzip.compress(body, compresslevel=6), args.repeat)
+        gzip_size = len(gzip.compress(body, compresslevel=6))
+        gzip_col = f"{gzip_size}B {gzip_us:.0f}us"
+        if brotli is not None:
+            brotli_us = timed(lambda: brotli.compress(body, quality=4), args.repeat)
+            brotli_col = f"{len(brotli.compress(body, quality=4))}B {brotli_us:.0f}us"
+        else:
+            brotli_col = "not installed"
+
+        print(f"{name:<22} {standard_us:>10.0f}us {fast_us:>10.0f}us {standard_us / fast_us:>7.1f}x "
+              f"{len(body):>9} {gzip_col:>16} {brotli_col:>16}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+# Cold-start budget check. Imports app.main in fresh interpreters and fails
+# (exit code 1) if the fastest import exceeds the budget, or if a module that
+# is meant to load on first use is imported at startup. Prints the slowest
+# imports to show where the time went.
+# --serve also starts uvicorn and times how long until /healthz answers
+# (this needs the configured MongoDB, since /healthz pings it).
+#
+# Usage (from backend/): python check_import_time.py [--budget-ms 1500] [--runs 5] [--serve]
+
+# Loaded on first use by the code that needs them (LLM calls, email, PDFs)
+LAZY_MODULES = ["openai", "resend", "fpdf"]
+
+_CHILD = """
+import json, sys, time
+start = time.perf_counter()
+import app.main
+print(json.dumps({
+    "seconds": time.perf_counter() - start,
+    "eager": sorted(m for m in %r if m in sys.modules),
+}))
+""" % (LAZY_MODULES,)
+
+_IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def backend_dir() -> str:
+    return os.path.dirname(os.path.abspath(__file__))
+
+
+def measure_import() -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", _CHILD], cwd=backend_dir(), capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def slowest_imports(top: int) -> list:
+    """
+    (cumulative_ms, package) for the slowest third-party and stdlib packages
+    app.main imports, from python -X importtime.
+    """
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=backend_dir(), capture_output=True, text=True, check=True
+    ).stderr
+    packages = {}
+    for line in stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            cumulative_us, module = int(match.group(2)), match.group(4)
+            package = module.split(".")[0]
+            if package == "app":
+                continue
+            # The first-level line of a package carries its whole cost
+            packages[package] = max(packages.get(package, 0), cumulative_us)
+    ranked = sorted(packages.items(), key=lambda item: item[1], reverse=True)
+    return [(us / 1000, package) for package, us in ranked[:top]]
+
+
+def time_to_healthz(port: int, timeout: float) -> float:
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=backend_dir(),
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/healthz", timeout=timeout):
+                    return time.perf_counter() - start
+            except urllib.error.HTTPError:
+                return time.perf_counter() - start
+            except (urllib.error.URLError, ConnectionError):
+                if server.poll() is not None:
+                    raise RuntimeError(f"uvicorn exited with code {server.returncode}")
+                time.sleep(0.02)
+        raise RuntimeError(f"/healthz did not answer within {timeout}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--budget-ms", type=float, default=1500)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--serve", action="store_true")
+    parser.add_argument("--serve-budget-ms", type=float, default=3000)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    results = [measure_import() for _ in range(args.runs)]
+    best_ms = min(r["seconds"] for r in results) * 1000
+    eager = sorted({m for r in results for m in r["eager"]})
+
+    print(f"import app.main: {best_ms:.0f}ms best of {args.runs} (budget {args.budget_ms:.0f}ms)")
+    print("Slowest packages (cumulative, one -X importtime run):")
+    for ms, package in slowest_imports(args.top):
+        print(f"  {ms:8.1f}ms  {package}")
+
+    failed = False
+    if best_ms > args.budget_ms:
+        print(f"FAIL import time is over budget by {best_ms - args.budget_ms:.0f}ms")
+        failed = True
+    if eager:
+        print(f"FAIL imported at startup but meant to load on first use: {', '.join(eager)}")
+        failed = True
+
+    if args.serve:
+        serve_ms = time_to_healthz(args.port, timeout=max(args.serve_budget_ms / 1000 * 5, 30)) * 1000
+        print(f"process start to first /healthz: {serve_ms:.0f}ms (budget {args.serve_budget_ms:.0f}ms)")
+        if serve_ms > args.serve_budget_ms:
+            print(f"FAIL time to first /healthz is over budget by {serve_ms - args.serve_budget_ms:.0f}ms")
+            failed = True
+
+    if failed:
+        return 1
+    print("Within budget.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,53 @@
+import asyncio
+import sys
+from app.db import database
+from app.db.indexes import duplicate_lead_emails, ensure_indexes, explain_hot_queries, merge_duplicate_leads
+from app.services import analysis_cache, email_outbox
+from app.services.stats_service import reconcile_stats
+
+# Fails (exit code 1) if any hot query would scan a whole collection, or if
+# duplicate lead emails keep the unique leads.email index from being built.
+# Usage (from backend/): python check_indexes.py [--no-create] [--merge-duplicate-leads]
+# --no-create only checks, leaving the database's indexes as they are.
+# --merge-duplicate-leads keeps the oldest lead per email, moves the other
+# leads' responses to it and deletes them (then rebuilds the dashboard stats).
+
+async def main() -> int:
+    database.connect()
+    failed = 0
+
+    duplicates = await duplicate_lead_emails()
+    if duplicates and "--merge-duplicate-leads" in sys.argv:
+        deleted = await merge_duplicate_leads()
+        await reconcile_stats()
+        print(f"Merged duplicate leads: deleted {deleted}, dashboard stats rebuilt")
+        duplicates = await duplicate_lead_emails()
+    if duplicates:
+        print("FAIL leads.email has duplicates, so its unique index cannot be built:")
+        for duplicate in duplicates:
+            print(f"  {duplicate['email']}: {duplicate['count']} leads")
+        print("Run with --merge-duplicate-leads to keep the oldest lead per email.")
+        failed += 1
+
+    if "--no-create" not in sys.argv:
+        print("Ensuring indexes...")
+        await ensure_indexes()
+        await analysis_cache.ensure_indexes()
+        await email_outbox.ensure_indexes()
+
+    scans = 0
+    for result in await explain_hot_queries():
+        status = "ok  " if result["ok"] else "FAIL"
+        print(f"{status} {result['query']}: {' > '.join(result['stages'])}")
+        scans += not result["ok"]
+
+    if scans:
+        print(f"{scans} hot quer{'y' if scans == 1 else 'ies'} use a COLLSCAN")
+        failed += 1
+    if failed:
+        return 1
+    print("All hot queries use an index.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
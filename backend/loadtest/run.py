@@ -0,0 +1,294 @@
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import sys
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+import httpx
+from app.core.questions import QUESTIONS
+
+# Load driver: virtual users run the founder flow and/or the admin dashboard
+# against a running backend and report latency per route.
+#
+#   python -m loadtest.run --base-url http://localhost:8000 --users 50 --duration 60 \
+#       --scenario mixed --admin-ratio 0.1 --output loadtest/results/run.json
+#
+# Compare two runs:  python -m loadtest.run --compare loadtest/results/before.json loadtest/results/after.json
+# See loadtest/README.md for starting the app against local mongod and the stubs.
+# Needs the dev requirements: pip install -r requirements-dev.txt
+
+TEXT_ANSWERS = [
+    "Hiring senior engineers fast enough",
+    "Outbound sales through LinkedIn",
+    "Founder is the bottleneck on every decision",
+    "Pricing and packaging for mid-market",
+    "Curious, scrappy, direct",
+]
+
+
+def random_answers(rng: random.Random, unique: bool) -> dict:
+    answers = {}
+    for question in QUESTIONS:
+        if question.options:
+            answers[question.id] = rng.choice(question.options)
+        else:
+            answers[question.id] = rng.choice(TEXT_ANSWERS)
+    if unique:
+        # Defeats the analysis cache so every submission reaches the LLM
+        answers["q1"] = f"{answers['q1']} ({uuid.uuid4().hex[:8]})"
+    return answers
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.statuses: Dict[str, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+
+    async def request(self, client: httpx.AsyncClient, route: str, method: str, url: str, ok=(200, 201, 202), **kwargs) -> Optional[httpx.Response]:
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.latencies[route].append((time.perf_counter() - start) * 1000)
+            self.errors[route] += 1
+            self.statuses[route][0] += 1
+            return None
+        self.latencies[route].append((time.perf_counter() - start) * 1000)
+        self.statuses[route][response.status_code] += 1
+        if response.status_code not in ok:
+            self.errors[route] += 1
+            return None
+        return response
+
+    def flow(self, name: str, elapsed_ms: float, ok: bool):
+        self.latencies[name].append(elapsed_ms)
+        if not ok:
+            self.errors[name] += 1
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def founder_flow(client: httpx.AsyncClient, recorder: Recorder, rng: random.Random, args) -> bool:
+    start = time.perf_counter()
+    ok = await _founder_steps(client, recorder, rng, args)
+    recorder.flow("flow founder", (time.perf_counter() - start) * 1000, ok)
+    return ok
+
+
+async def _founder_steps(client, recorder, rng, args) -> bool:
+    email = f"load-{uuid.uuid4().hex[:12]}@example.com"
+    lead = await recorder.request(client, "POST /leads", "POST", "/leads", json={
+        "name": "Load Test", "email": email, "company_size": rng.choice(["1-10", "11-50", "51-200"]),
+    })
+    if lead is None:
+        return False
+
+    unique = rng.random() >= args.repeat_answers
+    submitted = await recorder.request(client, "POST /responses", "POST", "/responses", json={
+        "lead_id": lead.json()["id"], "answers": random_answers(rng, unique),
+    })
+    if submitted is None:
+        return False
+    result_id = submitted.json()["result_id"]
+
+    # In job mode the analysis arrives later; poll like the results page does
+    status = submitted.json().get("status", "done")
+    deadline = time.monotonic() + args.result_timeout
+    while True:
+        result = await recorder.request(client, "GET /results/{result_id}", "GET", f"/results/{result_id}")
+        if result is None:
+            return False
+        status = result.json().get("status", "done")
+        if status != "pending" or time.monotonic() > deadline:
+            break
+        await asyncio.sleep(args.poll_interval)
+    if status != "done":
+        return False
+
+    if rng.random() < args.email_ratio:
+        emailed = await recorder.request(
+            client, "POST /results/{result_id}/email", "POST", f"/results/{result_id}/email"
+        )
+        if emailed is None:
+            return False
+    return True
+
+
+async def admin_token(client: httpx.AsyncClient, args) -> str:
+    credentials = {"email": args.admin_email, "password": args.admin_password}
+    response = await client.post("/auth/login", json=credentials)
+    if response.status_code == 401:
+        await client.post("/auth/signup", json=credentials)
+        response = await client.post("/auth/login", json=credentials)
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+async def admin_flow(client: httpx.AsyncClient, recorder: Recorder, token: str) -> bool:
+    start = time.perf_counter()
+    headers = {"Authorization": f"Bearer {token}"}
+    ok = (
+        await recorder.request(client, "GET /auth/me", "GET", "/auth/me", headers=headers) is not None
+        and await recorder.request(client, "GET /admin/stats", "GET", "/admin/stats", headers=headers) is not None
+    )
+    if ok:
+        page = await recorder.request(client, "GET /admin/responses", "GET", "/admin/responses", headers=headers)
+        ok = page is not None
+        cursor = page.headers.get("X-Next-Cursor") if page is not None else None
+        if cursor:
+            ok = await recorder.request(
+                client, "GET /admin/responses?cursor", "GET", "/admin/responses",
+                headers=headers, params={"cursor": cursor},
+            ) is not None
+    recorder.flow("flow admin", (time.perf_counter() - start) * 1000, ok)
+    return ok
+
+
+async def virtual_user(n: int, client: httpx.AsyncClient, recorder: Recorder, token: Optional[str], stop_at: float, args):
+    rng = random.Random(args.seed + n if args.seed is not None else None)
+    iterations = 0
+    while time.monotonic() < stop_at and (not args.iterations or iterations < args.iterations):
+        iterations += 1
+        if args.scenario == "admin" or (args.scenario == "mixed" and rng.random() < args.admin_ratio):
+            await admin_flow(client, recorder, token)
+        else:
+            await founder_flow(client, recorder, rng, args)
+        if args.think_time:
+            await asyncio.sleep(rng.uniform(0, 2 * args.think_time))
+
+
+def summarize(recorder: Recorder, elapsed: float) -> Dict[str, dict]:
+    summary = {}
+    for route, values in sorted(recorder.latencies.items()):
+        summary[route] = {
+            "count": len(values),
+            "errors": recorder.errors.get(route, 0),
+            "throughput_rps": round(len(values) / elapsed, 2),
+            "p50_ms": round(percentile(values, 50), 1),
+            "p95_ms": round(percentile(values, 95), 1),
+            "p99_ms": round(percentile(values, 99), 1),
+            "max_ms": round(max(values), 1),
+            "statuses": {str(code): count for code, count in sorted(recorder.statuses.get(route, {}).items())},
+        }
+    return summary
+
+
+def print_table(summary: Dict[str, dict]):
+    print(f"{'route':<36} {'count':>7} {'err':>5} {'rps':>8} {'p50':>9} {'p95':>9} {'p99':>9}")
+    for route, stats in summary.items():
+        print(
+            f"{route:<36} {stats['count']:>7} {stats['errors']:>5} {stats['throughput_rps']:>8.1f} "
+            f"{stats['p50_ms']:>7.1f}ms {stats['p95_ms']:>7.1f}ms {stats['p99_ms']:>7.1f}ms"
+        )
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(before_path: str, after_path: str):
+    with open(before_path) as f:
+        before = json.load(f)
+    with open(after_path) as f:
+        after = json.load(f)
+
+    print(f"{before.get('revision')} -> {after.get('revision')}")
+    print(f"{'route':<36} {'p50':>16} {'p95':>16} {'p99':>16} {'rps':>14}")
+    for route in sorted(set(before["routes"]) | set(after["routes"])):
+        old, new = before["routes"].get(route), after["routes"].get(route)
+        if old is None or new is None:
+            print(f"{route:<36} {'only in ' + (after_path if old is None else before_path)}")
+            continue
+
+        def delta(key):
+            change = (new[key] - old[key]) / old[key] * 100 if old[key] else 0.0
+            return f"{new[key]:>8.1f} {change:>+6.1f}%"
+
+        print(f"{route:<36} {delta('p50_ms'):>16} {delta('p95_ms'):>16} {delta('p99_ms'):>16} {delta('throughput_rps'):>14}")
+
+
+async def main(args):
+    limits = httpx.Limits(max_connections=args.users, max_keepalive_connections=args.users)
+    timeout = httpx.Timeout(args.request_timeout)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=timeout) as client:
+        token = await admin_token(client, args) if args.scenario in ("admin", "mixed") else None
+
+        recorder = Recorder()
+        started_at = datetime.now(timezone.utc)
+        start = time.perf_counter()
+        stop_at = time.monotonic() + args.duration
+        await asyncio.gather(*(
+            virtual_user(n, client, recorder, token, stop_at, args) for n in range(args.users)
+        ))
+        elapsed = time.perf_counter() - start
+
+    summary = summarize(recorder, elapsed)
+    print_table(summary)
+
+    if args.output:
+        report = {
+            "started_at": started_at.isoformat(),
+            "elapsed_seconds": round(elapsed, 2),
+            "revision": git_revision(),
+            "config": {
+                key: value for key, value in vars(args).items()
+                if key not in ("output", "compare", "admin_password")
+            },
+            "routes": summary,
+        }
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote {args.output}")
+
+    total_errors = sum(stats["errors"] for route, stats in summary.items() if not route.startswith("flow "))
+    return 1 if args.max_error_rate is not None and total_errors > args.max_error_rate * sum(
+        stats["count"] for route, stats in summary.items() if not route.startswith("flow ")
+    ) else 0
+
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--scenario", choices=["founder", "admin", "mixed"], default="mixed")
+    parser.add_argument("--users", type=int, default=20, help="concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds to run")
+    parser.add_argument("--iterations", type=int, default=0, help="flows per user (0 = until --duration)")
+    parser.add_argument("--admin-ratio", type=float, default=0.1, help="share of admin flows in mixed runs")
+    parser.add_argument("--email-ratio", type=float, default=0.5, help="share of founders who email the report")
+    parser.add_argument("--repeat-answers", type=float, default=0.0,
+                        help="share of submissions that may hit the analysis cache")
+    parser.add_argument("--think-time", type=float, default=0.0, help="mean pause between flows, seconds")
+    parser.add_argument("--poll-interval", type=float, default=0.5)
+    parser.add_argument("--result-timeout", type=float, default=120.0)
+    parser.add_argument("--request-timeout", type=float, default=120.0)
+    parser.add_argument("--admin-email", default="loadtest-admin@example.com")
+    parser.add_argument("--admin-password", default="loadtest-password")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--max-error-rate", type=float, default=None,
+                        help="exit 1 if the request error rate is above this fraction")
+    parser.add_argument("--output", help="write the JSON report here")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"), help="compare two JSON reports")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.compare:
+        compare(*args.compare)
+        sys.exit(0)
+    sys.exit(asyncio.run(main(args)))
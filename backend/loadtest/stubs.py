@@ -0,0 +1,159 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+# Local stand-ins for the external services, with injectable latency and errors.
+#
+#   python -m loadtest.stubs llm --port 9100 --latency 1.5 --jitter 0.5 --error-rate 0.05
+#   python -m loadtest.stubs resend --port 9200 --latency 0.2 --error-rate 0.01
+#
+# Point the app at them with OPENROUTER_BASE_URL / GEMINI_BASE_URL=http://localhost:9100
+# and RESEND_API_URL=http://localhost:9200. GET /_stats on either stub returns
+# its call counters.
+
+SECTIONS = ["mindset_shift", "operational_focus", "next_move"]
+
+
+class Faults:
+    def __init__(self, latency: float, jitter: float, error_rate: float, seed: int = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.stats = {"calls": 0, "errors": 0}
+
+    async def apply(self) -> bool:
+        """
+        Sleeps for the configured latency; returns True if this call should fail.
+        """
+        self.stats["calls"] += 1
+        delay = max(0.0, self.latency + self.random.uniform(-self.jitter, self.jitter))
+        if delay:
+            await asyncio.sleep(delay)
+        if self.random.random() < self.error_rate:
+            self.stats["errors"] += 1
+            return True
+        return False
+
+
+def _analysis_text(model: str) -> str:
+    return json.dumps({
+        key: {
+            "title": f"Stub {key.replace('_', ' ')}",
+            "description": f"Generated by the {model} stub for load testing.",
+        }
+        for key in SECTIONS
+    })
+
+
+def llm_app(faults: Faults) -> FastAPI:
+    """
+    OpenAI-compatible /chat/completions, streaming and non-streaming.
+    """
+    app = FastAPI()
+
+    @app.post("/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        if await faults.apply():
+            return JSONResponse({"error": {"message": "Injected failure"}}, status_code=503)
+
+        model = body.get("model", "stub")
+        text = _analysis_text(model)
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        created = int(time.time())
+
+        # Rough token counts (4 characters per token)
+        prompt_tokens = sum(len(str(m.get("content", ""))) for m in body.get("messages", [])) // 4
+        completion_tokens = len(text) // 4
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+
+        if body.get("stream"):
+            async def chunks():
+                for start in range(0, len(text), 40):
+                    chunk = {
+                        "id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                        "choices": [{"index": 0, "delta": {"content": text[start:start + 40]}, "finish_reason": None}],
+                    }
+                    yield f"data: {json.dumps(chunk)}\n\n"
+                if (body.get("stream_options") or {}).get("include_usage"):
+                    chunk = {
+                        "id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                        "choices": [], "usage": usage,
+                    }
+                    yield f"data: {json.dumps(chunk)}\n\n"
+                yield "data: [DONE]\n\n"
+            return StreamingResponse(chunks(), media_type="text/event-stream")
+
+        return {
+            "id": completion_id, "object": "chat.completion", "created": created, "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+            "usage": usage,
+        }
+
+    @app.get("/_stats")
+    async def stats():
+        return faults.stats
+
+    return app
+
+
+def resend_app(faults: Faults) -> FastAPI:
+    """
+    Accepts POST /emails like the Resend API, without sending anything.
+    """
+    app = FastAPI()
+
+    @app.post("/emails")
+    async def send_email(request: Request):
+        body = await request.json()
+        if await faults.apply():
+            return JSONResponse(
+                {"statusCode": 503, "name": "application_error", "message": "Injected failure"}, status_code=503
+            )
+        if not body.get("to") or not body.get("from"):
+            return JSONResponse(
+                {"statusCode": 422, "name": "validation_error", "message": "Missing to/from"}, status_code=422
+            )
+        return {"id": str(uuid.uuid4())}
+
+    @app.get("/_stats")
+    async def stats():
+        return faults.stats
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("service", choices=["llm", "resend"])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int)
+    parser.add_argument("--latency", type=float, default=None, help="mean seconds per call")
+    parser.add_argument("--jitter", type=float, default=0.0, help="+/- seconds around the mean")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of calls that fail")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.service == "llm":
+        faults = Faults(args.latency if args.latency is not None else 1.0, args.jitter, args.error_rate, args.seed)
+        app, port = llm_app(faults), args.port or 9100
+    else:
+        faults = Faults(args.latency if args.latency is not None else 0.1, args.jitter, args.error_rate, args.seed)
+        app, port = resend_app(faults), args.port or 9200
+
+    uvicorn.run(app, host=args.host, port=port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
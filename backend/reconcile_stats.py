@@ -0,0 +1,16 @@
+import asyncio
+from app.db import database
+from app.services.stats_service import reconcile_stats
+
+# Rebuilds the materialized dashboard counters from the raw collections.
+# Usage (from backend/): python reconcile_stats.py
+
+async def main():
+    database.connect()
+    print("Rebuilding dashboard stats...")
+    totals = await reconcile_stats()
+    database.close()
+    print(f"Done. leads={totals['leads']} responses={totals['responses']}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
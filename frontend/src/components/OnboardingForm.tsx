@@ -33,6 +33,7 @@ import {
 import { useNavigate } from "react-router-dom";
 import { showSuccess } from "@/utils/toast";
 import { API_URL } from "@/config";
+import { idempotencyKeyFor } from "@/utils/idempotency";
 
 const formSchema = z.object({
   name: z.string().min(2, {
@@ -59,16 +60,18 @@ const OnboardingForm: React.FC = () => {
 
   const onSubmit = async (values: z.infer<typeof formSchema>) => {
     try {
+      const body = JSON.stringify({
+        name: values.name,
+        email: values.email,
+        company_size: values.companySize,
+      });
       const response = await fetch(`${API_URL}/leads`, {
         method: "POST",
         headers: {
           "Content-Type": "application/json",
+          "Idempotency-Key": idempotencyKeyFor(body),
         },
-        body: JSON.stringify({
-          name: values.name,
-          email: values.email,
-          company_size: values.companySize,
-        }),
+        body,
       });
 
       if (!response.ok) {
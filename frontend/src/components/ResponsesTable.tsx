@@ -18,6 +18,7 @@ interface UserResponse {
 }
 
 import { API_URL } from "@/config";
+import { subscribeLive } from "@/utils/adminLive";
 
 const ResponsesTable: React.FC = () => {
   const [responses, setResponses] = useState<UserResponse[]>([]);
@@ -51,6 +52,17 @@ const ResponsesTable: React.FC = () => {
     };
 
     fetchResponses();
+
+    // New responses appear at the top as they come in
+    return subscribeLive(({ event, data }) => {
+      if (event === "response.created") {
+        setResponses((current) =>
+          current.some((item) => item.id === data.id) ? current : [data, ...current]
+        );
+      } else if (event === "resync") {
+        fetchResponses();
+      }
+    });
   }, []);
 
   if (isLoading) {
@@ -5,6 +5,7 @@ import { diagnosticQuestions, Question } from "@/data/questions";
 import { showSuccess } from "@/utils/toast";
 import { useNavigate } from "react-router-dom"; // Import useNavigate
 import { API_URL } from "@/config";
+import { idempotencyKeyFor } from "@/utils/idempotency";
 
 interface QuestionContextType {
   currentQuestionIndex: number;
@@ -43,15 +44,17 @@ export const QuestionProvider: React.FC<{ children: ReactNode }> = ({ children }
     }
 
     try {
+      const body = JSON.stringify({
+        lead_id: leadId,
+        answers: answers,
+      });
       const response = await fetch(`${API_URL}/responses`, {
         method: "POST",
         headers: {
           "Content-Type": "application/json",
+          "Idempotency-Key": idempotencyKeyFor(body),
         },
-        body: JSON.stringify({
-          lead_id: leadId,
-          answers: answers,
-        }),
+        body,
       });
 
       if (!response.ok) {
@@ -10,6 +10,7 @@ import { Button } from "@/components/ui/button";
 import { Label } from "@/components/ui/label";
 import { useToast } from "@/hooks/use-toast";
 import { API_URL } from "@/config";
+import { subscribeLive } from "@/utils/adminLive";
 
 interface AdminStats {
   total_leads: number;
@@ -31,6 +32,36 @@ const AdminPage: React.FC = () => {
     }
   }, [token]);
 
+  useEffect(() => {
+    if (!token) return;
+    // Each lead/response is counted once, even if a reconnect replays it
+    const counted = new Set<string>();
+    return subscribeLive(({ event, data }) => {
+      if (event === "ready" || event === "resync") {
+        // (Re)connected: start from fresh totals rather than from what the
+        // page loaded before the stream was open
+        counted.clear();
+        fetchStats();
+        return;
+      }
+      if (event !== "lead.created" && event !== "response.created") return;
+      const key = `${event}:${data.id}`;
+      if (counted.has(key)) return;
+      counted.add(key);
+      setStats((current) => {
+        if (!current) return current;
+        const total_leads = current.total_leads + (event === "lead.created" ? 1 : 0);
+        const total_responses = current.total_responses + (event === "response.created" ? 1 : 0);
+        return {
+          ...current,
+          total_leads,
+          total_responses,
+          completion_rate: total_leads ? Math.round((total_responses / total_leads) * 10000) / 100 : 0,
+        };
+      });
+    });
+  }, [token]);
+
   const handleLogin = async (e: React.FormEvent) => {
     e.preventDefault();
     setIsLoading(true);
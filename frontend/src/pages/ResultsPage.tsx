@@ -5,7 +5,6 @@ import { Brain, TrendingUp, Lightbulb, Download, Loader2, Mail } from 'lucide-re
 import { MadeWithDyad } from '@/components/made-with-dyad';
 import { useNavigate } from "react-router-dom";
 import { useToast } from "@/hooks/use-toast";
-import jsPDF from 'jspdf';
 import { API_URL } from "@/config";
 
 interface AnalysisSection {
@@ -19,75 +18,40 @@ interface AnalysisResult {
   next_move: AnalysisSection;
 }
 
+// Same as the server's fallback analysis
+const FALLBACK_ANALYSIS: AnalysisResult = {
+  mindset_shift: {
+    title: "Strategic Alignment",
+    description: "Focus on aligning your daily actions with your long-term vision to prevent burnout.",
+  },
+  operational_focus: {
+    title: "Process Documentation",
+    description: "Start documenting your core processes to reduce dependency on your direct involvement.",
+  },
+  next_move: {
+    title: "Audit Your Time",
+    description: "Spend the next 2 days tracking exactly where your time goes to identify low-leverage tasks.",
+  },
+};
+
 const ResultsPage: React.FC = () => {
   const [analysis, setAnalysis] = useState<AnalysisResult | null>(null);
   const [loading, setLoading] = useState(true);
   const [sendingEmail, setSendingEmail] = useState(false);
+  const [pending, setPending] = useState(false);
   const navigate = useNavigate();
   const { toast } = useToast();
 
-  const generatePDF = () => {
-    if (!analysis) return null;
-
-    const doc = new jsPDF();
-    
-    // Title
-    doc.setFontSize(22);
-    doc.setTextColor(41, 128, 185); // Blue color
-    doc.text("Founder Clarity Report", 105, 20, { align: "center" });
-    
-    // Subtitle
-    doc.setFontSize(12);
-    doc.setTextColor(100);
-    doc.text("Personalized Insights to help you move forward", 105, 30, { align: "center" });
-
-    let yPos = 50;
-
-    // Helper to add sections
-    const addSection = (header: string, title: string, description: string, color: [number, number, number]) => {
-      // Section Header
-      doc.setFontSize(10);
-      doc.setTextColor(...color);
-      doc.setFont("helvetica", "bold");
-      doc.text(header, 20, yPos);
-      yPos += 7;
-
-      // Card Title
-      doc.setFontSize(16);
-      doc.setTextColor(33, 33, 33);
-      doc.setFont("helvetica", "bold");
-      doc.text(title, 20, yPos);
-      yPos += 10;
-
-      // Description
-      doc.setFontSize(12);
-      doc.setFont("helvetica", "normal");
-      doc.setTextColor(60, 60, 60);
-      
-      const splitDesc = doc.splitTextToSize(description, 170);
-      doc.text(splitDesc, 20, yPos);
-      yPos += (splitDesc.length * 7) + 15;
-    };
-
-    const mindset = analysis.mindset_shift || { title: "N/A", description: "N/A" };
-    const operational = analysis.operational_focus || { title: "N/A", description: "N/A" };
-    const nextMove = analysis.next_move || { title: "N/A", description: "N/A" };
-
-    addSection("TOP MINDSET SHIFT", mindset.title, mindset.description, [37, 99, 235]); // Blue
-    addSection("OPERATIONAL FOCUS", operational.title, operational.description, [22, 163, 74]); // Green
-    addSection("YOUR NEXT MOVE", nextMove.title, nextMove.description, [217, 119, 6]); // Amber
-
-    // Disclaimer
-    doc.setFontSize(10);
-    doc.setTextColor(150);
-    doc.text("Disclaimer: These insights are directional and intended for reflection.", 105, 280, { align: "center" });
-
-    return doc;
-  };
-
   const handleDownloadPDF = () => {
-    const doc = generatePDF();
-    if (doc) doc.save("founder-clarity-report.pdf");
+    const resultId = localStorage.getItem("result_id");
+    if (!resultId) return;
+    // Rendered (and cached) by the server; it is sent as an attachment
+    const link = document.createElement("a");
+    link.href = `${API_URL}/results/${resultId}/report.pdf`;
+    link.download = "founder-clarity-report.pdf";
+    document.body.appendChild(link);
+    link.click();
+    link.remove();
   };
 
   const handleEmailReport = async () => {
@@ -97,16 +61,9 @@ const ResultsPage: React.FC = () => {
 
     setSendingEmail(true);
     try {
-      const doc = generatePDF();
-      if (!doc) return;
-      const pdfBlob = doc.output('blob');
-      
-      const formData = new FormData();
-      formData.append("file", pdfBlob, "founder-clarity-report.pdf");
-
+      // The server attaches the report it renders itself; nothing to upload
       const response = await fetch(`${API_URL}/results/${resultId}/email`, {
         method: "POST",
-        body: formData,
       });
 
       if (!response.ok) throw new Error("Failed to send email");
@@ -129,6 +86,8 @@ const ResultsPage: React.FC = () => {
   };
 
   useEffect(() => {
+    let cancelled = false;
+
     const fetchResults = async () => {
       const resultId = localStorage.getItem("result_id");
       if (!resultId) {
@@ -136,29 +95,53 @@ const ResultsPage: React.FC = () => {
         return;
       }
 
+      // In job mode the analysis is generated in the background: poll
+      // while it is pending, backing off from 1s to 8s, for about 2 minutes
+      let delay = 1000;
+      const giveUpAt = Date.now() + 120000;
       try {
-        const response = await fetch(`${API_URL}/results/${resultId}`);
-        if (!response.ok) {
-          throw new Error("Failed to fetch results");
+        while (!cancelled) {
+          const response = await fetch(`${API_URL}/results/${resultId}`);
+          if (!response.ok) {
+            throw new Error("Failed to fetch results");
+          }
+          const data = await response.json();
+          if (data.status === "failed") {
+            // Results from before the server stored its own fallback
+            setAnalysis(FALLBACK_ANALYSIS);
+            return;
+          }
+          if (data.status !== "pending") {
+            setAnalysis(data.analysis);
+            return;
+          }
+          if (Date.now() + delay > giveUpAt) {
+            throw new Error("Analysis is still pending");
+          }
+          setPending(true);
+          await new Promise((resolve) => setTimeout(resolve, delay));
+          delay = Math.min(delay * 2, 8000);
         }
-        const data = await response.json();
-        // Handle both old and new format gracefully or just expect new format
-        // We'll assume new format as we just updated the backend
-        setAnalysis(data.analysis);
       } catch (error) {
         console.error("Error fetching results:", error);
       } finally {
-        setLoading(false);
+        if (!cancelled) setLoading(false);
       }
     };
 
     fetchResults();
+    return () => {
+      cancelled = true;
+    };
   }, [navigate]);
 
   if (loading) {
     return (
       <div className="min-h-screen flex items-center justify-center bg-gradient-to-br from-blue-50 to-indigo-100">
-        <Loader2 className="h-12 w-12 animate-spin text-blue-600" />
+        <div className="flex flex-col items-center gap-4">
+          <Loader2 className="h-12 w-12 animate-spin text-blue-600" />
+          {pending && <p className="text-gray-700">Generating your personalized analysis...</p>}
+        </div>
       </div>
     );
   }
@@ -0,0 +1,94 @@
+import { API_URL } from "@/config";
+
+// Live admin updates from GET /admin/live (Server-Sent Events). EventSource
+// cannot send the Authorization header, so the stream is read with fetch.
+// One connection is shared by every listener on the page; it reconnects
+// with the last event id so the server replays what was missed, and
+// delivers "resync" when it could not, meaning: reload over REST.
+
+export type LiveEvent = {
+  event: string;
+  data: any;
+};
+
+type Listener = (event: LiveEvent) => void;
+
+const listeners = new Set<Listener>();
+let controller: AbortController | null = null;
+let lastEventId: string | null = null;
+let retryMs = 5000;
+
+const dispatch = (event: LiveEvent) => {
+  listeners.forEach((listener) => listener(event));
+};
+
+const handleBlock = (block: string) => {
+  let event = "message";
+  let data = "";
+  for (const line of block.split("\n")) {
+    if (line.startsWith(":")) continue;
+    const separator = line.indexOf(":");
+    const field = separator === -1 ? line : line.slice(0, separator);
+    const value = separator === -1 ? "" : line.slice(separator + 1).replace(/^ /, "");
+    if (field === "id") lastEventId = value;
+    else if (field === "event") event = value;
+    else if (field === "data") data += data ? `\n${value}` : value;
+    else if (field === "retry" && /^\d+$/.test(value)) retryMs = Number(value);
+  }
+  if (data) dispatch({ event, data: JSON.parse(data) });
+};
+
+const connect = async (signal: AbortSignal) => {
+  let failures = 0;
+  while (!signal.aborted) {
+    const token = localStorage.getItem('admin_token');
+    if (!token) return;
+    try {
+      const headers: Record<string, string> = { 'Authorization': `Bearer ${token}` };
+      if (lastEventId) headers['Last-Event-ID'] = lastEventId;
+      const response = await fetch(`${API_URL}/admin/live`, { headers, signal });
+      if (response.status === 401) return;
+      if (!response.ok || !response.body) throw new Error(`Live feed returned ${response.status}`);
+
+      failures = 0;
+      const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+      let buffer = "";
+      while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += value.replace(/\r\n?/g, "\n");
+        let end;
+        while ((end = buffer.indexOf("\n\n")) !== -1) {
+          handleBlock(buffer.slice(0, end));
+          buffer = buffer.slice(end + 2);
+        }
+      }
+    } catch (error) {
+      if (signal.aborted) return;
+      failures += 1;
+      console.error("Live feed disconnected", error);
+    }
+    // The server ends streams on purpose now and then; back off only on errors
+    const delay = failures ? Math.min(retryMs * 2 ** (failures - 1), 60000) : 0;
+    await new Promise((resolve) => setTimeout(resolve, delay));
+  }
+};
+
+export const subscribeLive = (listener: Listener) => {
+  listeners.add(listener);
+  if (!controller) {
+    controller = new AbortController();
+    const current = controller;
+    connect(current.signal).finally(() => {
+      // Gave up (logged out or token rejected): the next subscriber starts over
+      if (controller === current) controller = null;
+    });
+  }
+  return () => {
+    listeners.delete(listener);
+    if (listeners.size === 0 && controller) {
+      controller.abort();
+      controller = null;
+    }
+  };
+};
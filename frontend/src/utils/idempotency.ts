@@ -0,0 +1,14 @@
+// One Idempotency-Key per distinct request body: resubmitting the same body
+// (double click, retry after a dropped connection) reuses the key so the
+// server replays its first response instead of doing the work again.
+export const idempotencyKeyFor = (() => {
+  const keys = new Map<string, string>();
+  return (body: string) => {
+    let key = keys.get(body);
+    if (!key) {
+      key = crypto.randomUUID();
+      keys.set(body, key);
+    }
+    return key;
+  };
+})();